@@ -0,0 +1,270 @@
+"""Benchmark Entity Janitor scan, clean, backup and export on synthetic registries.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/bench_janitor.py --sizes 1000,10000,50000 --output results.json
+
+For every data set size each operation is run twice on a fresh data set:
+once for wall time and the longest event loop block, and once under
+tracemalloc for peak memory. Results are printed as JSON so runs of
+different versions can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeConfigEntry, FakeHass, FakeStore, populate  # noqa: E402
+from custom_components.entity_janitor import coordinator as coordinator_module  # noqa: E402
+from custom_components.entity_janitor.button import EntityJanitorTemplateButton  # noqa: E402
+from custom_components.entity_janitor.const import (  # noqa: E402
+    BACKUP_FORMAT_JSON,
+    BACKUP_FORMAT_NDJSON,
+    BACKUP_FORMAT_STORE,
+    CONF_EXCLUDED_DOMAINS,
+    CONF_SCAN_TIME_BUDGET_MS,
+    DEFAULT_SCAN_TIME_BUDGET_MS,
+)
+from custom_components.entity_janitor.coordinator import (  # noqa: E402
+    EntityJanitorCoordinator,
+)
+from homeassistant.config_entries import ConfigEntryState  # noqa: E402
+
+# Route registry lookups to the stand-ins
+coordinator_module.async_get_entity_registry = lambda hass: hass.entity_registry
+coordinator_module.async_get_device_registry = lambda hass: hass.device_registry
+coordinator_module.Store = FakeStore
+
+OPERATIONS = [
+    "scan",
+    "device_scan",
+    "backup_json",
+    "backup_ndjson_gz",
+    # backup_store_repeat backs up the same results again; listed after
+    # backup_store it measures a backup with nothing new to store
+    "backup_store",
+    "backup_store_repeat",
+    "export_report",
+    "clean",
+]
+EXCLUDED_DOMAIN = "automation"
+
+
+class LoopMonitor:
+    """Measure the longest time the event loop was unable to run a task."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """Initialize the monitor."""
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.max_block = 0.0
+
+    async def _run(self) -> None:
+        """Sleep in short ticks and record how late each tick wakes up."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            late = time.perf_counter() - started - self._interval
+            self.max_block = max(self.max_block, late)
+
+    async def __aenter__(self) -> "LoopMonitor":
+        """Start monitoring."""
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop monitoring."""
+        # Let a tick that is already overdue record how late it is
+        await asyncio.sleep(self._interval)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _build(config_dir: str, args: argparse.Namespace, size: int) -> EntityJanitorCoordinator:
+    """Create a stand-in hass with a populated registry and a coordinator."""
+    hass = FakeHass(config_dir)
+    populate(
+        hass,
+        size,
+        args.orphaned_devices,
+        args.unloaded_entries,
+        args.excluded_domains,
+        EXCLUDED_DOMAIN,
+        args.seed,
+    )
+    entry = hass.config_entries.add(
+        FakeConfigEntry("entity_janitor", ConfigEntryState.LOADED)
+    )
+    entry.options = {
+        CONF_EXCLUDED_DOMAINS: [EXCLUDED_DOMAIN],
+        CONF_SCAN_TIME_BUDGET_MS: args.time_budget_ms,
+    }
+    coordinator = EntityJanitorCoordinator(hass, entry)
+    coordinator.data = coordinator._build_data()
+    return coordinator
+
+
+def _operation(
+    name: str, coordinator: EntityJanitorCoordinator
+) -> Callable[[], Awaitable[Any]]:
+    """Return a zero-argument coroutine function running one operation."""
+    if name == "scan":
+        return coordinator.async_scan_for_obsolete
+    if name == "device_scan":
+        return coordinator.async_scan_devices
+    if name == "backup_json":
+        return lambda: coordinator.async_backup_entities(
+            coordinator.obsolete_entities, BACKUP_FORMAT_JSON
+        )
+    if name == "backup_ndjson_gz":
+        return lambda: coordinator.async_backup_entities(
+            coordinator.obsolete_entities, BACKUP_FORMAT_NDJSON
+        )
+    if name in ("backup_store", "backup_store_repeat"):
+        return lambda: coordinator.async_backup_entities(
+            coordinator.obsolete_entities, BACKUP_FORMAT_STORE
+        )
+    if name == "export_report":
+        button = EntityJanitorTemplateButton(coordinator, "export_report")
+        button.hass = coordinator.hass
+        return button._export_report
+    if name == "clean":
+        return lambda: coordinator.async_clean_obsolete(
+            dry_run=False, backup_before_clean=False
+        )
+    raise ValueError(f"Unknown operation: {name}")
+
+
+async def _run_size(args: argparse.Namespace, size: int) -> List[Dict[str, Any]]:
+    """Benchmark every operation for one data set size."""
+    results: Dict[str, Dict[str, Any]] = {
+        name: {"entities": size, "operation": name} for name in args.operations
+    }
+
+    for track_memory in (False, True):
+        with tempfile.TemporaryDirectory() as config_dir:
+            coordinator = await _build(config_dir, args, size)
+            if "scan" not in args.operations:
+                await coordinator.async_scan_for_obsolete()
+
+            for name in args.operations:
+                operation = _operation(name, coordinator)
+                result = results[name]
+                if track_memory:
+                    tracemalloc.start()
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    await operation()
+                    result["peak_memory_bytes"] = (
+                        tracemalloc.get_traced_memory()[1] - baseline
+                    )
+                    tracemalloc.stop()
+                    continue
+
+                async with LoopMonitor() as monitor:
+                    started = time.perf_counter()
+                    await operation()
+                    result["wall_time_s"] = round(time.perf_counter() - started, 4)
+                result["max_loop_block_ms"] = round(monitor.max_block * 1000, 2)
+                result["obsolete_count"] = len(coordinator.obsolete_entities)
+
+    return list(results.values())
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,50000,200000",
+        help="comma separated entity counts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--operations",
+        default=",".join(OPERATIONS),
+        help="comma separated operations (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--orphaned-devices", type=float, default=0.1,
+        help="share of entities on missing or entry-less devices",
+    )
+    parser.add_argument(
+        "--unloaded-entries", type=float, default=0.1,
+        help="share of entities belonging to unloaded config entries",
+    )
+    parser.add_argument(
+        "--excluded-domains", type=float, default=0.05,
+        help="share of entities in an excluded domain",
+    )
+    parser.add_argument(
+        "--time-budget-ms", type=int, default=DEFAULT_SCAN_TIME_BUDGET_MS,
+        help="scan time slice passed to the coordinator (0 scans in one pass)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.operations = args.operations.split(",")
+    for name in args.operations:
+        if name not in OPERATIONS:
+            parser.error(f"unknown operation: {name}")
+    return args
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmarks and return the report."""
+    with open(
+        os.path.join(
+            os.path.dirname(coordinator_module.__file__), "manifest.json"
+        ),
+        encoding="utf-8",
+    ) as file:
+        version = json.load(file)["version"]
+
+    results = []
+    for size in args.sizes:
+        results.extend(await _run_size(args, size))
+        print(f"Finished {size} entities", file=sys.stderr)
+
+    return {
+        "meta": {
+            "version": version,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orphaned_devices": args.orphaned_devices,
+            "unloaded_entries": args.unloaded_entries,
+            "excluded_domains": args.excluded_domains,
+            "time_budget_ms": args.time_budget_ms,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point."""
+    args = _parse_args(argv)
+    report = asyncio.run(_main(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Lightweight stand-ins for Home Assistant objects used by the benchmarks.
+
+Only the attributes and methods Entity Janitor touches are implemented, so
+data sets with hundreds of thousands of entities can be built in seconds
+without loading the real registries.
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+from uuid import uuid4
+
+from homeassistant.config_entries import ConfigEntryState
+
+
+class FakeRegistryEntry:
+    """Entity registry entry."""
+
+    __slots__ = (
+        "entity_id",
+        "domain",
+        "platform",
+        "unique_id",
+        "device_id",
+        "config_entry_id",
+        "created_at",
+        "name",
+        "original_name",
+        "disabled_by",
+    )
+
+    def __init__(
+        self,
+        entity_id: str,
+        platform: str,
+        unique_id: str,
+        device_id: Optional[str],
+        config_entry_id: Optional[str],
+        created_at: datetime,
+    ) -> None:
+        """Initialize the entry."""
+        self.entity_id = entity_id
+        self.domain = entity_id.split(".")[0]
+        self.platform = platform
+        self.unique_id = unique_id
+        self.device_id = device_id
+        self.config_entry_id = config_entry_id
+        self.created_at = created_at
+        self.name = None
+        self.original_name = entity_id.split(".")[1].replace("_", " ").title()
+        self.disabled_by = None
+
+
+class FakeEntityRegistry:
+    """Entity registry keyed by entity id."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.entities: Dict[str, FakeRegistryEntry] = {}
+
+    def async_remove(self, entity_id: str) -> None:
+        """Remove an entity."""
+        del self.entities[entity_id]
+
+    def async_get_or_create(
+        self,
+        domain: str,
+        platform: str,
+        unique_id: str,
+        *,
+        suggested_object_id: Optional[str] = None,
+        config_entry: Any = None,
+        device_id: Optional[str] = None,
+        original_name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> FakeRegistryEntry:
+        """Register an entity."""
+        entity_id = f"{domain}.{suggested_object_id or unique_id}"
+        entry = FakeRegistryEntry(
+            entity_id,
+            platform,
+            unique_id,
+            device_id,
+            config_entry.entry_id if config_entry else None,
+            datetime.now(timezone.utc),
+        )
+        self.entities[entity_id] = entry
+        return entry
+
+
+class FakeDevice:
+    """Device registry entry."""
+
+    __slots__ = (
+        "id",
+        "config_entries",
+        "via_device_id",
+        "name",
+        "name_by_user",
+        "manufacturer",
+        "model",
+    )
+
+    def __init__(self, device_id: str, config_entries: Set[str]) -> None:
+        """Initialize the device."""
+        self.id = device_id
+        self.config_entries = config_entries
+        self.via_device_id: Optional[str] = None
+        self.name: Optional[str] = None
+        self.name_by_user: Optional[str] = None
+        self.manufacturer: Optional[str] = None
+        self.model: Optional[str] = None
+
+
+class FakeDeviceRegistry:
+    """Device registry keyed by device id."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.devices: Dict[str, FakeDevice] = {}
+
+    def async_remove_device(self, device_id: str) -> None:
+        """Remove a device."""
+        del self.devices[device_id]
+
+
+class FakeConfigEntry:
+    """Config entry with a fixed state."""
+
+    def __init__(self, domain: str, state: ConfigEntryState) -> None:
+        """Initialize the entry."""
+        self.entry_id = uuid4().hex
+        self.domain = domain
+        self.state = state
+        self.options: Dict[str, Any] = {}
+
+
+class FakeConfigEntries:
+    """Config entry manager."""
+
+    def __init__(self) -> None:
+        """Initialize the manager."""
+        self._entries: Dict[str, FakeConfigEntry] = {}
+
+    def add(self, entry: FakeConfigEntry) -> FakeConfigEntry:
+        """Add an entry."""
+        self._entries[entry.entry_id] = entry
+        return entry
+
+    def async_entries(self, domain: Optional[str] = None) -> List[FakeConfigEntry]:
+        """Return all entries."""
+        return list(self._entries.values())
+
+    def async_get_entry(self, entry_id: str) -> Optional[FakeConfigEntry]:
+        """Return an entry by id."""
+        return self._entries.get(entry_id)
+
+
+class FakeStates:
+    """State machine holding the ids of entities that have a state."""
+
+    def __init__(self) -> None:
+        """Initialize the state machine."""
+        self.entity_ids: Set[str] = set()
+
+    def get(self, entity_id: str) -> Optional[str]:
+        """Return a placeholder state if the entity has one."""
+        return "on" if entity_id in self.entity_ids else None
+
+
+class FakeBus:
+    """Event bus that only counts events."""
+
+    def __init__(self) -> None:
+        """Initialize the bus."""
+        self.fired: Dict[str, int] = {}
+
+    def async_fire(self, event_type: str, event_data: Any = None) -> None:
+        """Count an event."""
+        self.fired[event_type] = self.fired.get(event_type, 0) + 1
+
+    fire = async_fire
+
+    def async_listen(self, event_type: str, listener: Callable) -> Callable[[], None]:
+        """Pretend to listen."""
+        return lambda: None
+
+    async_listen_once = async_listen
+
+
+class FakeStore:
+    """Storage helper that keeps the last saved data in memory."""
+
+    def __init__(self, hass: Any, version: int, key: str) -> None:
+        """Initialize the store."""
+        self.data: Any = None
+
+    async def async_load(self) -> Any:
+        """Return the saved data."""
+        return self.data
+
+    async def async_save(self, data: Any) -> None:
+        """Save data."""
+        self.data = data
+
+    async def async_remove(self) -> None:
+        """Drop the saved data."""
+        self.data = None
+
+
+class FakeConfig:
+    """Core config pointing at a scratch config directory."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the config."""
+        self.config_dir = config_dir
+
+    def path(self, *parts: str) -> str:
+        """Return a path inside the config directory."""
+        return os.path.join(self.config_dir, *parts)
+
+
+class FakeHass:
+    """The parts of HomeAssistant that Entity Janitor uses."""
+
+    def __init__(self, config_dir: str) -> None:
+        """Initialize the stand-in."""
+        self.loop = asyncio.get_running_loop()
+        self.data: Dict[str, Any] = {}
+        self.config = FakeConfig(config_dir)
+        self.config_entries = FakeConfigEntries()
+        self.states = FakeStates()
+        self.bus = FakeBus()
+        self.entity_registry = FakeEntityRegistry()
+        self.device_registry = FakeDeviceRegistry()
+
+    def async_add_executor_job(self, target: Callable, *args: Any) -> asyncio.Future:
+        """Run a function in the default executor."""
+        return self.loop.run_in_executor(None, target, *args)
+
+    def async_create_task(self, target: Any, name: Optional[str] = None) -> asyncio.Task:
+        """Schedule a coroutine."""
+        return self.loop.create_task(target, name=name)
+
+    def async_run_hass_job(self, job: Any, *args: Any) -> Optional[asyncio.Task]:
+        """Run a job scheduled through the event helpers, such as a timer."""
+        result = job.target(*args)
+        if asyncio.iscoroutine(result):
+            return self.loop.create_task(result)
+        return None
+
+
+def populate(
+    hass: FakeHass,
+    entity_count: int,
+    orphaned_device_share: float,
+    unloaded_entry_share: float,
+    excluded_domain_share: float,
+    excluded_domain: str,
+    seed: int = 0,
+) -> None:
+    """Fill the registries with a synthetic data set.
+
+    Shares are fractions of entity_count. Entities that are not orphaned,
+    unloaded or excluded belong to loaded config entries and have a state.
+    """
+    rng = random.Random(seed)
+    created_at = datetime.now(timezone.utc) - timedelta(days=365)
+    entity_registry = hass.entity_registry
+    device_registry = hass.device_registry
+    config_entries = hass.config_entries
+    entities_per_device = 5
+    entities_per_entry = 200
+
+    loaded = [
+        config_entries.add(FakeConfigEntry(f"loaded_{i}", ConfigEntryState.LOADED))
+        for i in range(max(entity_count // entities_per_entry, 1))
+    ]
+    unloaded = [
+        config_entries.add(
+            FakeConfigEntry(f"unloaded_{i}", ConfigEntryState.NOT_LOADED)
+        )
+        for i in range(max(int(entity_count * unloaded_entry_share) // entities_per_entry, 1))
+    ]
+    domains = ["sensor", "binary_sensor", "switch", "light", "climate"]
+    device: Optional[FakeDevice] = None
+
+    for index in range(entity_count):
+        roll = rng.random()
+        domain = rng.choice(domains)
+        device_id = None
+        config_entry_id = None
+        has_state = False
+
+        if roll < orphaned_device_share:
+            # Half point at a missing device, half at a device without entries
+            platform = "orphaned"
+            device_id = f"orphan_{index // entities_per_device}"
+            if index % 2:
+                device_registry.devices.setdefault(
+                    device_id, FakeDevice(device_id, set())
+                )
+        elif roll < orphaned_device_share + unloaded_entry_share:
+            platform = "unloaded"
+            config_entry_id = rng.choice(unloaded).entry_id
+        elif roll < orphaned_device_share + unloaded_entry_share + excluded_domain_share:
+            platform = excluded_domain
+            domain = excluded_domain
+            has_state = True
+        else:
+            platform = "healthy"
+            config_entry_id = rng.choice(loaded).entry_id
+            if index % entities_per_device == 0 or device is None:
+                device = FakeDevice(f"device_{index}", {config_entry_id})
+                device_registry.devices[device.id] = device
+            device_id = device.id
+            config_entry_id = next(iter(device.config_entries))
+            has_state = True
+
+        entity_id = f"{domain}.{platform}_{index}"
+        entity_registry.entities[entity_id] = FakeRegistryEntry(
+            entity_id, platform, f"uid_{index}", device_id, config_entry_id, created_at
+        )
+        if has_state:
+            hass.states.entity_ids.add(entity_id)
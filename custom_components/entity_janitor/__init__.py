@@ -3,21 +3,18 @@ Entity Janitor - Home Assistant Custom Integration
 Automatically detects and manages obsolete entities in Home Assistant.
 """
 import logging
-from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.const import Platform
 
-from .const import DOMAIN, PLATFORMS
+from .const import DOMAIN, PLATFORMS, STORAGE_KEY, STORAGE_VERSION
 from .coordinator import EntityJanitorCoordinator
 from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(hours=1)
-
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Entity Janitor integration."""
@@ -35,6 +32,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data[DOMAIN][entry.entry_id] = coordinator
     _LOGGER.info("Coordinator stored in hass.data")
     
+    # Warm start from the results saved before the last restart
+    restored = await coordinator.async_load_results()
+
     # Initial data fetch
     try:
         await coordinator.async_config_entry_first_refresh()
@@ -72,25 +72,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error(f"Failed to setup services: {ex}")
         return False
     
-    # Setup periodic scanning if enabled
-    if entry.options.get("auto_scan", False):
-        async_track_time_interval(
-            hass, coordinator.async_scan_for_obsolete, SCAN_INTERVAL
-        )
-        _LOGGER.info("Periodic scanning enabled")
+    # Keep the obsolete list current between full scans, and run the first
+    # scan once startup has settled unless saved results can be used. With
+    # auto scan on, every full scan schedules the next one as a
+    # consistency check; the coordinator cancels it on unload
+    coordinator.async_schedule_startup(
+        scan=entry.options.get("auto_scan", False) or not restored
+    )
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
     
     _LOGGER.info("Entity Janitor integration setup completed successfully")
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the scan schedule."""
+    if coordinator := hass.data[DOMAIN].get(entry.entry_id):
+        coordinator.async_update_schedule()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
     
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved scan results when the integration is removed."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY).async_remove()
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
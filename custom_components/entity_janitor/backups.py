@@ -0,0 +1,181 @@
+"""Deduplicated backup store for Entity Janitor."""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import suppress
+from typing import IO, Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .files import STORE_FORMAT, STORE_PACK_DIR, encode_record, write_atomic, write_json
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes of the BLAKE2b digest that addresses a record or a pack
+HASH_SIZE = 12
+PACK_EXTENSION = ".ndjson.gz"
+
+
+def _hash(data: str) -> str:
+    """Return the content address of a string."""
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=HASH_SIZE).hexdigest()
+
+
+class BackupStore:
+    """Content-addressed backups in one directory.
+
+    Records are stored once, in gzip packs of one JSON line per record
+    keyed by the hash of the record. Each backup is a manifest listing the
+    hashes of its records per pack, so a backup only writes the records no
+    kept manifest refers to yet. Manifests beyond the retention are
+    deleted, together with the packs no manifest refers to anymore.
+
+    File I/O runs in the executor; callers make sure only one write or
+    prune runs at a time.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the store; nothing is read until the first write."""
+        self.path = path
+        self.pack_dir = os.path.join(path, STORE_PACK_DIR)
+        # Pack holding each stored record, by record hash
+        self._pack_of: Optional[Dict[str, str]] = None
+        # Prefix, creation time and packs of each kept manifest, by file name
+        self._manifests: Dict[str, Tuple[str, float, FrozenSet[str]]] = {}
+
+    def _load(self) -> Dict[str, str]:
+        """Index the records of the kept manifests, once per store."""
+        if self._pack_of is not None:
+            return self._pack_of
+
+        os.makedirs(self.pack_dir, exist_ok=True)
+        pack_of: Dict[str, str] = {}
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.path, name), encoding="utf-8") as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError) as ex:
+                _LOGGER.warning(f"Skipping unreadable backup manifest {name}: {ex}")
+                continue
+            if manifest.get("format") != STORE_FORMAT:
+                continue
+            packs = manifest["packs"]
+            for pack, hashes in packs.items():
+                for record_hash in hashes:
+                    pack_of[record_hash] = pack
+            self._manifests[name] = (
+                manifest["prefix"],
+                manifest["created"],
+                frozenset(packs),
+            )
+
+        self._pack_of = pack_of
+        return pack_of
+
+    def write(
+        self, prefix: str, kind: str, records: List[Any], timestamp: str
+    ) -> Tuple[str, int]:
+        """Back up records; return the manifest name and the new record count."""
+        pack_of = self._load()
+        packs: Dict[str, List[str]] = {}
+        new_hashes: List[str] = []
+        new_lines: List[str] = []
+        seen = set()
+
+        for record in records:
+            body = encode_record(record)
+            record_hash = _hash(body)
+            if record_hash in seen:
+                continue
+            seen.add(record_hash)
+            pack = pack_of.get(record_hash)
+            if pack is None:
+                new_hashes.append(record_hash)
+                new_lines.append(f'{{"hash":"{record_hash}","record":{body}}}\n')
+            else:
+                packs.setdefault(pack, []).append(record_hash)
+
+        if new_hashes:
+            pack = _hash("".join(new_hashes)) + PACK_EXTENSION
+
+            def _write(file: IO[bytes]) -> None:
+                with gzip.GzipFile(fileobj=file, mode="wb") as gz_file:
+                    gz_file.write("".join(new_lines).encode("utf-8"))
+
+            write_atomic(os.path.join(self.pack_dir, pack), _write)
+            packs.setdefault(pack, []).extend(new_hashes)
+            for record_hash in new_hashes:
+                pack_of[record_hash] = pack
+
+        name = f"{prefix}_{timestamp}.json"
+        suffix = 1
+        while name in self._manifests:
+            name = f"{prefix}_{timestamp}_{suffix}.json"
+            suffix += 1
+        created = time.time()
+        write_json(
+            os.path.join(self.path, name),
+            {
+                "format": STORE_FORMAT,
+                "prefix": prefix,
+                "kind": kind,
+                "timestamp": timestamp,
+                "created": created,
+                "total_count": len(seen),
+                "new_count": len(new_hashes),
+                "packs": packs,
+            },
+            indent=None,
+        )
+        self._manifests[name] = (prefix, created, frozenset(packs))
+        return name, len(new_hashes)
+
+    def prune(self, prefix: str, max_count: int, max_age_days: int) -> int:
+        """Delete the manifests of prefix beyond the retention.
+
+        Keeps at most max_count manifests no older than max_age_days; 0
+        turns either limit off, and the newest manifest is always kept.
+        Packs no kept manifest refers to are deleted as well. Returns the
+        number of deleted manifests.
+        """
+        pack_of = self._load()
+        newest_first = sorted(
+            (
+                (created, name)
+                for name, (manifest_prefix, created, _) in self._manifests.items()
+                if manifest_prefix == prefix
+            ),
+            reverse=True,
+        )
+        cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+        expired = [
+            name
+            for index, (created, name) in enumerate(newest_first)
+            if index
+            and (
+                (max_count and index >= max_count)
+                or (cutoff is not None and created < cutoff)
+            )
+        ]
+        if not expired:
+            return 0
+
+        for name in expired:
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(self.path, name))
+            del self._manifests[name]
+
+        live = set().union(*(packs for _, _, packs in self._manifests.values()))
+        for pack in os.listdir(self.pack_dir):
+            if pack.endswith(PACK_EXTENSION) and pack not in live:
+                with suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.pack_dir, pack))
+        self._pack_of = {
+            record_hash: pack
+            for record_hash, pack in pack_of.items()
+            if pack in live
+        }
+        return len(expired)
@@ -12,6 +12,7 @@ from homeassistant.helpers.entity import EntityCategory, DeviceInfo
 
 from .const import DOMAIN
 from .coordinator import EntityJanitorCoordinator
+from .files import async_write_json
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -157,11 +158,10 @@ class EntityJanitorTemplateButton(CoordinatorEntity, ButtonEntity):
         dry_run = self.coordinator.config_entry.options.get("dry_run_mode", False)
         backup_enabled = self.coordinator.config_entry.options.get("backup_before_clean", True)
 
-        obsolete_entities = getattr(self.coordinator, 'obsolete_entities', [])
-        if backup_enabled and obsolete_entities and not dry_run:
-            await self.coordinator.async_backup_entities(obsolete_entities)
-
-        await self.coordinator.async_clean_obsolete(dry_run=dry_run)
+        # The cleanup writes the backup itself, of exactly what it removes
+        await self.coordinator.async_clean_obsolete(
+            dry_run=dry_run, backup_before_clean=backup_enabled
+        )
 
         # Fire event
         self.hass.bus.async_fire(
@@ -178,7 +178,6 @@ class EntityJanitorTemplateButton(CoordinatorEntity, ButtonEntity):
             _LOGGER.warning("No obsolete entities to export")
             return
 
-        import json
         from datetime import datetime
 
         report = {
@@ -186,14 +185,16 @@ class EntityJanitorTemplateButton(CoordinatorEntity, ButtonEntity):
             "obsolete_count": len(obsolete_entities),
             "entities": [
                 {
-                    "entity_id": entity_data["entity_id"],
-                    "domain": entity_data["entity_id"].split(".")[0],
-                    "name": entity_data.get("name", "Unknown"),
-                    "last_seen": entity_data.get("created_at", "Unknown"),
-                    "reason": entity_data.get("reason", "Unknown"),
-                    "platform": entity_data.get("platform", "Unknown"),
+                    "entity_id": entity.entity_id,
+                    "domain": entity.domain,
+                    "name": entity.name or "Unknown",
+                    "last_seen": (
+                        entity.created_at.isoformat() if entity.created_at else "Unknown"
+                    ),
+                    "reason": entity.reason or "Unknown",
+                    "platform": entity.platform or "Unknown",
                 }
-                for entity_data in obsolete_entities
+                for entity in obsolete_entities
             ],
         }
 
@@ -202,8 +203,7 @@ class EntityJanitorTemplateButton(CoordinatorEntity, ButtonEntity):
             f"entity_janitor_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         )
         try:
-            with open(file_path, "w") as f:
-                json.dump(report, f, indent=2)
+            await async_write_json(self.hass, file_path, report)
             _LOGGER.info(f"Report exported to {file_path}")
         except Exception as e:
             _LOGGER.error(f"Failed to export report: {e}")
@@ -212,16 +212,8 @@ class EntityJanitorTemplateButton(CoordinatorEntity, ButtonEntity):
         """Reset statistics and clear cached data."""
         _LOGGER.info("Resetting Entity Janitor statistics")
 
-        # Clear obsolete entities cache
-        if hasattr(self.coordinator, '_obsolete_entities'):
-            self.coordinator._obsolete_entities.clear()
-
-        # Reset last scan time
-        if hasattr(self.coordinator, '_last_scan'):
-            self.coordinator._last_scan = None
-
-        # Request refresh
-        await self.coordinator.async_request_refresh()
+        # Clear obsolete entities cache and last scan time
+        self.coordinator.async_reset_results()
 
         # Fire event
         self.hass.bus.async_fire(
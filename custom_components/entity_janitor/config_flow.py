@@ -1,13 +1,58 @@
 """Config flow for Entity Janitor integration."""
 import logging
+from typing import Any, Dict, Optional
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    BACKUP_FORMAT_EXTENSIONS,
+    CONF_AUTO_CLEAN_MAX_PERCENT,
+    CONF_AUTO_CLEAN_RATE,
+    CONF_BACKUP_FORMAT,
+    CONF_BACKUP_RETENTION_COUNT,
+    CONF_BACKUP_RETENTION_DAYS,
+    CONF_DETAIL_EVENTS,
+    CONF_DISABLED_RULES,
+    CONF_ENABLED_RULES,
+    CONF_EXCLUDED_CONFIG_ENTRIES,
+    CONF_EXCLUDED_DOMAINS,
+    CONF_EXCLUDED_ENTITIES,
+    CONF_EXCLUDED_PLATFORMS,
+    CONF_MINIMUM_AGE_DAYS,
+    CONF_SCAN_INTERVAL,
+    CONF_SCAN_TIME_BUDGET_MS,
+    CONF_STALE_DAYS,
+    CONF_STARTUP_SCAN_DELAY,
+    DEFAULT_AUTO_CLEAN_MAX_PERCENT,
+    DEFAULT_AUTO_CLEAN_RATE,
+    DEFAULT_BACKUP_FORMAT,
+    DEFAULT_BACKUP_RETENTION_COUNT,
+    DEFAULT_BACKUP_RETENTION_DAYS,
+    DEFAULT_EXCLUDED_DOMAINS,
+    DEFAULT_MINIMUM_AGE_DAYS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_TIME_BUDGET_MS,
+    DEFAULT_STALE_DAYS,
+    DEFAULT_STARTUP_SCAN_DELAY,
+    DOMAIN,
+)
+from .rules import RULES
 
 _LOGGER = logging.getLogger(__name__)
 
+_TEXT_LIST_SELECTOR = selector.TextSelector(
+    selector.TextSelectorConfig(multiple=True)
+)
+
+
+def _int_range(minimum: int, maximum: Optional[int] = None) -> vol.All:
+    """Return a validator for a whole number in a range."""
+    return vol.All(vol.Coerce(int), vol.Range(min=minimum, max=maximum))
+
+
 @config_entries.HANDLERS.register(DOMAIN)
 class EntityJanitorConfigFlow(config_entries.ConfigFlow):
     """Handle a config flow for Entity Janitor."""
@@ -33,3 +78,148 @@ class EntityJanitorConfigFlow(config_entries.ConfigFlow):
         return self.async_show_form(
             step_id="user",
         )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "EntityJanitorOptionsFlow":
+        """Return the options flow."""
+        return EntityJanitorOptionsFlow(config_entry)
+
+
+class EntityJanitorOptionsFlow(config_entries.OptionsFlow):
+    """Handle the Entity Janitor options.
+
+    The toggles that have a switch entity are left to their switches;
+    options not shown in the form are kept as they are.
+    """
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None):
+        """Show and save the options."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title="", data={**self._entry.options, **user_input}
+            )
+
+        return self.async_show_form(
+            step_id="init", data_schema=self._options_schema()
+        )
+
+    def _options_schema(self) -> vol.Schema:
+        """Return the options schema with the current values as defaults."""
+        options = self._entry.options
+        rule_selector = selector.SelectSelector(
+            selector.SelectSelectorConfig(options=sorted(RULES), multiple=True)
+        )
+        config_entry_selector = selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    selector.SelectOptionDict(
+                        value=entry.entry_id, label=f"{entry.title} ({entry.domain})"
+                    )
+                    for entry in self.hass.config_entries.async_entries()
+                    if entry.entry_id != self._entry.entry_id
+                ],
+                multiple=True,
+                custom_value=True,
+            )
+        )
+        backup_format_selector = selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=list(BACKUP_FORMAT_EXTENSIONS),
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        )
+
+        def _default(key: str, default: Any) -> Any:
+            return options.get(key, default)
+
+        return vol.Schema(
+            {
+                vol.Required(
+                    CONF_SCAN_INTERVAL,
+                    default=_default(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                ): _int_range(15, 1440),
+                vol.Required(
+                    CONF_STARTUP_SCAN_DELAY,
+                    default=_default(
+                        CONF_STARTUP_SCAN_DELAY, DEFAULT_STARTUP_SCAN_DELAY
+                    ),
+                ): _int_range(0),
+                vol.Required(
+                    CONF_SCAN_TIME_BUDGET_MS,
+                    default=_default(
+                        CONF_SCAN_TIME_BUDGET_MS, DEFAULT_SCAN_TIME_BUDGET_MS
+                    ),
+                ): _int_range(0),
+                vol.Required(
+                    CONF_MINIMUM_AGE_DAYS,
+                    default=_default(CONF_MINIMUM_AGE_DAYS, DEFAULT_MINIMUM_AGE_DAYS),
+                ): _int_range(0),
+                vol.Required(
+                    CONF_STALE_DAYS,
+                    default=_default(CONF_STALE_DAYS, DEFAULT_STALE_DAYS),
+                ): _int_range(1),
+                vol.Optional(
+                    CONF_ENABLED_RULES,
+                    default=list(_default(CONF_ENABLED_RULES, [])),
+                ): rule_selector,
+                vol.Optional(
+                    CONF_DISABLED_RULES,
+                    default=list(_default(CONF_DISABLED_RULES, [])),
+                ): rule_selector,
+                vol.Optional(
+                    CONF_EXCLUDED_DOMAINS,
+                    default=list(
+                        _default(CONF_EXCLUDED_DOMAINS, DEFAULT_EXCLUDED_DOMAINS)
+                    ),
+                ): _TEXT_LIST_SELECTOR,
+                vol.Optional(
+                    CONF_EXCLUDED_ENTITIES,
+                    default=list(_default(CONF_EXCLUDED_ENTITIES, [])),
+                ): _TEXT_LIST_SELECTOR,
+                vol.Optional(
+                    CONF_EXCLUDED_PLATFORMS,
+                    default=list(_default(CONF_EXCLUDED_PLATFORMS, [])),
+                ): _TEXT_LIST_SELECTOR,
+                vol.Optional(
+                    CONF_EXCLUDED_CONFIG_ENTRIES,
+                    default=list(_default(CONF_EXCLUDED_CONFIG_ENTRIES, [])),
+                ): config_entry_selector,
+                vol.Required(
+                    CONF_AUTO_CLEAN_RATE,
+                    default=_default(CONF_AUTO_CLEAN_RATE, DEFAULT_AUTO_CLEAN_RATE),
+                ): _int_range(1),
+                vol.Required(
+                    CONF_AUTO_CLEAN_MAX_PERCENT,
+                    default=_default(
+                        CONF_AUTO_CLEAN_MAX_PERCENT, DEFAULT_AUTO_CLEAN_MAX_PERCENT
+                    ),
+                ): _int_range(1, 100),
+                vol.Required(
+                    CONF_DETAIL_EVENTS,
+                    default=_default(CONF_DETAIL_EVENTS, False),
+                ): bool,
+                vol.Required(
+                    CONF_BACKUP_FORMAT,
+                    default=_default(CONF_BACKUP_FORMAT, DEFAULT_BACKUP_FORMAT),
+                ): backup_format_selector,
+                vol.Required(
+                    CONF_BACKUP_RETENTION_COUNT,
+                    default=_default(
+                        CONF_BACKUP_RETENTION_COUNT, DEFAULT_BACKUP_RETENTION_COUNT
+                    ),
+                ): _int_range(0),
+                vol.Required(
+                    CONF_BACKUP_RETENTION_DAYS,
+                    default=_default(
+                        CONF_BACKUP_RETENTION_DAYS, DEFAULT_BACKUP_RETENTION_DAYS
+                    ),
+                ): _int_range(0),
+            }
+        )
@@ -11,15 +11,35 @@ CONF_AUTO_CLEAN = "auto_clean"
 CONF_BACKUP_BEFORE_CLEAN = "backup_before_clean"
 CONF_EXCLUDED_DOMAINS = "excluded_domains"
 CONF_EXCLUDED_ENTITIES = "excluded_entities"
+CONF_EXCLUDED_PLATFORMS = "excluded_platforms"
+CONF_EXCLUDED_CONFIG_ENTRIES = "excluded_config_entries"
 CONF_MINIMUM_AGE_DAYS = "minimum_age_days"
 CONF_DRY_RUN = "dry_run"
 CONF_DRY_RUN_MODE = "dry_run_mode"
 CONF_NOTIFICATIONS_ENABLED = "notifications_enabled"
 CONF_DETAILED_LOGGING = "detailed_logging"
+CONF_SCAN_TIME_BUDGET_MS = "scan_time_budget_ms"
+CONF_BACKUP_FORMAT = "backup_format"
+CONF_STARTUP_SCAN_DELAY = "startup_scan_delay"
+CONF_ENABLED_RULES = "enabled_rules"
+CONF_DISABLED_RULES = "disabled_rules"
+CONF_STALE_DAYS = "stale_days"
+CONF_AUTO_CLEAN_RATE = "auto_clean_rate"
+CONF_AUTO_CLEAN_MAX_PERCENT = "auto_clean_max_percent"
+CONF_DETAIL_EVENTS = "detail_events"
+CONF_BACKUP_RETENTION_COUNT = "backup_retention_count"
+CONF_BACKUP_RETENTION_DAYS = "backup_retention_days"
 
 # Default values
 DEFAULT_SCAN_INTERVAL = 60  # minutes
 DEFAULT_MINIMUM_AGE_DAYS = 7
+DEFAULT_SCAN_TIME_BUDGET_MS = 20  # 0 scans in a single pass
+DEFAULT_STARTUP_SCAN_DELAY = 60  # seconds after Home Assistant has started
+DEFAULT_STALE_DAYS = 30
+DEFAULT_AUTO_CLEAN_RATE = 60  # entities per minute
+DEFAULT_AUTO_CLEAN_MAX_PERCENT = 10  # of the registry flagged by one scan
+DEFAULT_BACKUP_RETENTION_COUNT = 20  # backups per kind, 0 keeps any number
+DEFAULT_BACKUP_RETENTION_DAYS = 90  # 0 keeps backups of any age
 DEFAULT_EXCLUDED_DOMAINS = [
     "persistent_notification",
     "zone", 
@@ -30,11 +50,73 @@ DEFAULT_EXCLUDED_DOMAINS = [
     "scene"
 ]
 
+# Persisted scan results
+STORAGE_KEY = f"{DOMAIN}.results"
+STORAGE_VERSION = 1
+# Seconds to collect result changes before writing them to storage
+RESULTS_SAVE_DELAY = 30
+
+# Periodic full scans stretch up to this many scan intervals while the
+# registries stay quiet, and shrink to this share of one after an
+# integration is removed
+SCAN_BACKOFF_MAX_FACTOR = 8
+SCAN_BURST_INTERVAL_FACTOR = 0.25
+
+# Seconds to collect registry changes before re-checking the affected entities
+INCREMENTAL_RESCAN_COOLDOWN = 5
+
+# Entities checked between time budget checks during a full scan
+SCAN_CHUNK_SIZE = 250
+# Seconds between progress updates pushed to sensors while scanning
+SCAN_PROGRESS_INTERVAL = 1
+# Entities sampled after each full scan to measure rule hit rates
+RULE_SAMPLE_SIZE = 1000
+# Backup records re-registered between event loop yields during a restore
+RESTORE_BATCH_SIZE = 500
+# Registry removals between event loop yields during a cleanup
+CLEAN_BATCH_SIZE = 500
+# Entity ids listed in aggregated cleanup log lines
+LOG_SAMPLE_SIZE = 10
+
+# Changes of the obsolete results kept for get_scan_deltas
+DELTA_HISTORY_SIZE = 20
+# Added and removed entity ids listed in each obsolete changed event
+DELTA_EVENT_MAX_IDS = 1000
+
+# Entity ids per entity_janitor_details event, small enough for the recorder
+DETAIL_EVENT_CHUNK_SIZE = 500
+
+# Paging over obsolete results
+PAGE_SORT_KEYS = ["entity_id", "domain", "platform", "reason", "created_at", "name"]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Sorted result snapshots kept so open cursors stay valid across scans
+PAGE_SNAPSHOT_LIMIT = 4
+
+# Backup formats
+BACKUP_FORMAT_JSON = "json"
+BACKUP_FORMAT_NDJSON = "ndjson_gz"
+BACKUP_FORMAT_STORE = "store"
+BACKUP_FORMAT_EXTENSIONS = {
+    BACKUP_FORMAT_JSON: ".json",
+    BACKUP_FORMAT_NDJSON: ".ndjson.gz",
+    BACKUP_FORMAT_STORE: ".json",
+}
+DEFAULT_BACKUP_FORMAT = BACKUP_FORMAT_STORE
+# Directory of the deduplicated backup store, inside the config directory
+BACKUP_STORE_DIR = "entity_janitor_backups"
+
 # Service names
 SERVICE_SCAN_FOR_OBSOLETE = "scan_for_obsolete"
 SERVICE_CLEAN_OBSOLETE = "clean_obsolete"
 SERVICE_BACKUP_ENTITIES = "backup_entities"
 SERVICE_RESTORE_ENTITIES = "restore_entities"
+SERVICE_QUERY_OBSOLETE = "query_obsolete"
+SERVICE_LIST_OBSOLETE = "list_obsolete"
+SERVICE_SCAN_ORPHANED_DEVICES = "scan_orphaned_devices"
+SERVICE_CANCEL_SCAN = "cancel_scan"
+SERVICE_GET_SCAN_DELTAS = "get_scan_deltas"
+SERVICE_CLEAN_ORPHANED_DEVICES = "clean_orphaned_devices"
 
 # Attributes
 ATTR_OBSOLETE_COUNT = "obsolete_count"
@@ -46,4 +128,9 @@ ATTR_SKIPPED_COUNT = "skipped_count"
 
 # Events
 EVENT_OBSOLETE_FOUND = "entity_janitor_obsolete_found"
+EVENT_OBSOLETE_CHANGED = "entity_janitor_obsolete_changed"
+EVENT_DETAILS = "entity_janitor_details"
 EVENT_CLEANUP_COMPLETE = "entity_janitor_cleanup_complete"
+EVENT_RESTORE_COMPLETE = "entity_janitor_restore_complete"
+EVENT_DEVICE_CLEANUP_COMPLETE = "entity_janitor_device_cleanup_complete"
+EVENT_AUTO_CLEAN_BLOCKED = "entity_janitor_auto_clean_blocked"
@@ -1,28 +1,140 @@
 """Data update coordinator for Entity Janitor."""
+import asyncio
 import json
 import logging
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
+from contextlib import suppress
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components import persistent_notification
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    CoreState,
+    Event,
+    HomeAssistant,
+    callback,
+    valid_entity_id,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    ConfigEntry,
+    ConfigEntryChange,
+    ConfigEntryState,
+)
 from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    BACKUP_FORMAT_EXTENSIONS,
+    BACKUP_FORMAT_NDJSON,
+    BACKUP_FORMAT_STORE,
+    BACKUP_STORE_DIR,
+    CLEAN_BATCH_SIZE,
+    CONF_AUTO_CLEAN,
+    CONF_AUTO_CLEAN_MAX_PERCENT,
+    CONF_AUTO_CLEAN_RATE,
+    CONF_AUTO_SCAN,
+    CONF_BACKUP_BEFORE_CLEAN,
+    CONF_BACKUP_FORMAT,
+    CONF_BACKUP_RETENTION_COUNT,
+    CONF_BACKUP_RETENTION_DAYS,
+    CONF_DETAIL_EVENTS,
+    CONF_DETAILED_LOGGING,
+    CONF_DISABLED_RULES,
+    CONF_DRY_RUN_MODE,
+    CONF_ENABLED_RULES,
     CONF_MINIMUM_AGE_DAYS,
+    CONF_NOTIFICATIONS_ENABLED,
+    CONF_EXCLUDED_CONFIG_ENTRIES,
     CONF_EXCLUDED_DOMAINS,
     CONF_EXCLUDED_ENTITIES,
+    CONF_EXCLUDED_PLATFORMS,
+    CONF_SCAN_INTERVAL,
+    CONF_SCAN_TIME_BUDGET_MS,
+    CONF_STALE_DAYS,
+    CONF_STARTUP_SCAN_DELAY,
+    DEFAULT_AUTO_CLEAN_MAX_PERCENT,
+    DEFAULT_AUTO_CLEAN_RATE,
+    DEFAULT_BACKUP_FORMAT,
+    DEFAULT_BACKUP_RETENTION_COUNT,
+    DEFAULT_BACKUP_RETENTION_DAYS,
     DEFAULT_MINIMUM_AGE_DAYS,
     DEFAULT_EXCLUDED_DOMAINS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_TIME_BUDGET_MS,
+    DEFAULT_STALE_DAYS,
+    DEFAULT_STARTUP_SCAN_DELAY,
+    DELTA_EVENT_MAX_IDS,
+    DETAIL_EVENT_CHUNK_SIZE,
+    DELTA_HISTORY_SIZE,
+    EVENT_AUTO_CLEAN_BLOCKED,
+    EVENT_CLEANUP_COMPLETE,
+    EVENT_DETAILS,
+    EVENT_DEVICE_CLEANUP_COMPLETE,
+    EVENT_OBSOLETE_CHANGED,
+    EVENT_RESTORE_COMPLETE,
+    INCREMENTAL_RESCAN_COOLDOWN,
+    LOG_SAMPLE_SIZE,
+    PAGE_SNAPSHOT_LIMIT,
+    PAGE_SORT_KEYS,
+    RESTORE_BATCH_SIZE,
+    RESULTS_SAVE_DELAY,
+    RULE_SAMPLE_SIZE,
+    SCAN_BACKOFF_MAX_FACTOR,
+    SCAN_BURST_INTERVAL_FACTOR,
+    SCAN_CHUNK_SIZE,
+    SCAN_PROGRESS_INTERVAL,
+    STORAGE_KEY,
+    STORAGE_VERSION,
 )
+from .backups import BackupStore
+from .devices import DeviceScan
+from .exclusions import ExclusionMatcher
+from .files import (
+    async_write_json,
+    async_write_ndjson_gz,
+    iter_backup_records,
+    read_batch,
+)
+from .history import async_last_state_changes
+from .models import ObsoleteEntity, ObsoleteIndex, OrphanedDevice, ScanDelta
+from .rules import RulePipeline, ScanContext, select_rules
+from .stats import OperationStats
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class ScanCancelledError(HomeAssistantError):
+    """A full scan was cancelled before it finished."""
+
+
 class EntityJanitorCoordinator(DataUpdateCoordinator):
     """Coordinator for Entity Janitor data updates."""
 
@@ -32,133 +144,719 @@ class EntityJanitorCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=30),
+            # Data is pushed on changes; full scans have their own schedule
+            update_interval=None,
         )
         self.config_entry = config_entry
         self.hass = hass
-        self._obsolete_entities: List[Dict[str, Any]] = []
+        self._obsolete_entities = ObsoleteIndex()
+        # Bumped whenever the obsolete results change
+        self._generation = 0
+        # Sorted results per (generation, sort, descending) for paging
+        self._page_snapshots: Dict[
+            Tuple[int, str, bool], Tuple[ObsoleteEntity, ...]
+        ] = OrderedDict()
         self._last_scan: Optional[datetime] = None
         self._scan_in_progress = False
+        # Set on unload so a scan cancelled then schedules nothing new
+        self._shutting_down = False
+        # The running full scan, shared by every caller that asks for one
+        self._scan_task: Optional[asyncio.Task] = None
+        self._scan_cancel_requested = False
+        self._scan_progress: Optional[Dict[str, Any]] = None
+        # Stats of the last run per operation ("scan", "clean")
+        self._operation_stats: Dict[str, OperationStats] = {}
+        self._dirty_entity_ids: Set[str] = set()
+        self._rule_pipeline: Optional[RulePipeline] = None
+        # Recent changes of the obsolete results, oldest first
+        self._deltas: Deque[ScanDelta] = deque(maxlen=DELTA_HISTORY_SIZE)
+        # Compiled exclusions and the option values they were compiled from
+        self._exclusions: Optional[ExclusionMatcher] = None
+        self._exclusion_options: Optional[Tuple[Tuple[str, ...], ...]] = None
+        self._orphaned_devices: Dict[str, OrphanedDevice] = {}
+        self._last_device_scan: Optional[datetime] = None
+        # Last state change per entity from the last full scan's recorder query
+        self._last_changed: Optional[Dict[str, float]] = None
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Pending delayed save of the results, see _schedule_results_save
+        self._unsub_results_save: Optional[CALLBACK_TYPE] = None
+        self._unsub_stop: Optional[CALLBACK_TYPE] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_save_results_on_stop
+        )
+        self._backup_store = BackupStore(hass.config.path(BACKUP_STORE_DIR))
+        # Store writes and prunes must not interleave in the executor
+        self._backup_lock = asyncio.Lock()
+        # Periodic full scans, see _async_schedule_scan
+        self._unsub_scheduled_scan: Optional[CALLBACK_TYPE] = None
+        self._next_scheduled_scan: Optional[datetime] = None
+        self._scan_interval_factor: Optional[float] = None
+        self._scheduled_scan_interval: Optional[float] = None
+        self._registry_changes = 0
+        self._integrations_removed = 0
+        # Obsolete ids of the previous full scan; auto clean only removes
+        # entities flagged by two scans in a row
+        self._previous_obsolete_ids: Set[str] = set()
+        self._auto_clean_task: Optional[asyncio.Task] = None
+        self._unsub_listeners: List[Callable[[], None]] = []
+        self._rescan_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=INCREMENTAL_RESCAN_COOLDOWN,
+            immediate=False,
+            function=self.async_rescan_dirty,
+        )
+
+    def _build_data(self) -> Dict[str, Any]:
+        """Build the data exposed to entities."""
+        entity_registry = async_get_entity_registry(self.hass)
+        return {
+            "total_entities": len(entity_registry.entities),
+            "obsolete_entities": len(self._obsolete_entities),
+            "last_scan": self._last_scan,
+            "scan_in_progress": self._scan_in_progress,
+            "generation": self._generation,
+            "orphaned_devices": len(self._orphaned_devices),
+            "last_device_scan": self._last_device_scan,
+        }
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from API endpoint."""
         try:
-            # Get current entity and device registries
-            entity_registry = async_get_entity_registry(self.hass)
-            device_registry = async_get_device_registry(self.hass)
+            return self._build_data()
+        except Exception as ex:
+            raise UpdateFailed(f"Error communicating with API: {ex}") from ex
 
-            total_entities = len(entity_registry.entities)
-            obsolete_count = len(self._obsolete_entities)
+    def _fingerprint_inputs(self) -> Tuple[List[str], int, str]:
+        """Snapshot what the results fingerprint covers."""
+        entity_registry = async_get_entity_registry(self.hass)
+        device_registry = async_get_device_registry(self.hass)
+        options = self.config_entry.options
+        return (
+            list(entity_registry.entities),
+            len(device_registry.devices),
+            json.dumps(
+                [
+                    options.get(CONF_MINIMUM_AGE_DAYS, DEFAULT_MINIMUM_AGE_DAYS),
+                    sorted(options.get(CONF_EXCLUDED_DOMAINS, DEFAULT_EXCLUDED_DOMAINS)),
+                    sorted(options.get(CONF_EXCLUDED_ENTITIES, [])),
+                    sorted(options.get(CONF_EXCLUDED_PLATFORMS, [])),
+                    sorted(options.get(CONF_EXCLUDED_CONFIG_ENTRIES, [])),
+                    sorted(options.get(CONF_ENABLED_RULES, [])),
+                    sorted(options.get(CONF_DISABLED_RULES, [])),
+                    options.get(CONF_STALE_DAYS, DEFAULT_STALE_DAYS),
+                ]
+            ),
+        )
+
+    @staticmethod
+    def _results_fingerprint(
+        entity_ids: List[str], device_count: int, options: str
+    ) -> str:
+        """Return a cheap fingerprint of what the scan results depend on.
+
+        Covers the entity and device counts, the set of entity ids and the
+        options that decide verdicts. Config entry states are left out as
+        they settle during startup; changes to them are tracked instead.
+        Works on snapshots only, so it is safe to run in the executor.
+        """
+        checksum = 0
+        for entity_id in entity_ids:
+            checksum ^= zlib.crc32(entity_id.encode())
+        return (
+            f"{len(entity_ids)}:{device_count}:"
+            f"{checksum:08x}:{zlib.crc32(options.encode()):08x}"
+        )
 
-            return {
-                "total_entities": total_entities,
-                "obsolete_entities": obsolete_count,
-                "last_scan": self._last_scan,
-                "scan_in_progress": self._scan_in_progress,
-            }
+    async def async_load_results(self) -> bool:
+        """Load the results saved before the last restart if still valid."""
+        try:
+            stored = await self._store.async_load()
         except Exception as ex:
-            raise UpdateFailed(f"Error communicating with API: {ex}") from ex
+            _LOGGER.warning(f"Could not load saved scan results: {ex}")
+            return False
+        if not stored or not stored.get("last_scan"):
+            return False
+
+        fingerprint = await self.hass.async_add_executor_job(
+            self._results_fingerprint, *self._fingerprint_inputs()
+        )
+        if stored.get("fingerprint") != fingerprint:
+            _LOGGER.info("Registry changed since the last scan, saved results discarded")
+            return False
+
+        self._obsolete_entities = ObsoleteIndex(
+            ObsoleteEntity.from_dict(record) for record in stored["entities"]
+        )
+        self._last_scan = dt_util.parse_datetime(stored["last_scan"])
+        if self._obsolete_entities:
+            self._generation += 1
+            self._async_publish_delta(
+                ScanDelta(
+                    self._generation,
+                    "load",
+                    sorted(self._obsolete_entities.keys()),
+                    [],
+                    0,
+                )
+            )
+        # Config entries may have loaded differently; re-check the restored
+        # entities once tracking starts
+        self._dirty_entity_ids.update(self._obsolete_entities.keys())
+        _LOGGER.info(
+            f"Loaded {len(self._obsolete_entities)} obsolete entities "
+            f"from the scan at {stored['last_scan']}"
+        )
+        return True
+
+    @callback
+    def _schedule_results_save(self) -> None:
+        """Save the current results after a short delay.
+
+        Changes within the delay share one save, which snapshots the
+        results only when it runs.
+        """
+        if self._unsub_results_save is None:
+            self._unsub_results_save = async_call_later(
+                self.hass, RESULTS_SAVE_DELAY, self._async_save_results
+            )
+
+    async def _async_save_results(self, _now: Any = None) -> None:
+        """Save the results, building their stored form in the executor."""
+        if self._unsub_results_save is not None:
+            self._unsub_results_save()
+            self._unsub_results_save = None
+        records = tuple(self._obsolete_entities.values())
+        # Results waiting for a re-check must not be trusted after a restart
+        inputs = None if self._dirty_entity_ids else self._fingerprint_inputs()
+        data = await self.hass.async_add_executor_job(
+            self._results_to_save, self._last_scan, records, inputs
+        )
+        await self._store.async_save(data)
+
+    async def _async_save_results_on_stop(self, _event: Event) -> None:
+        """Save results still waiting for the delay before Home Assistant stops."""
+        self._unsub_stop = None
+        if self._unsub_results_save is not None:
+            await self._async_save_results()
+
+    @classmethod
+    def _results_to_save(
+        cls,
+        last_scan: Optional[datetime],
+        records: Tuple[ObsoleteEntity, ...],
+        inputs: Optional[Tuple[List[str], int, str]],
+    ) -> Dict[str, Any]:
+        """Return the results in their stored form; runs in the executor."""
+        return {
+            "last_scan": last_scan.isoformat() if last_scan else None,
+            "fingerprint": cls._results_fingerprint(*inputs) if inputs else None,
+            "entities": [record.as_dict() for record in records],
+        }
+
+    @callback
+    def async_schedule_startup(self, scan: bool) -> None:
+        """Start tracking, and optionally scan, once startup has settled.
+
+        Config entries are still loading while Home Assistant starts, so
+        checking entities then would flag them as not loaded. Waits for the
+        started event plus the settle delay; a reload while running only
+        waits for the event loop.
+        """
+        delay = 0
+        if self.hass.state is not CoreState.running:
+            delay = self.config_entry.options.get(
+                CONF_STARTUP_SCAN_DELAY, DEFAULT_STARTUP_SCAN_DELAY
+            )
 
-    async def async_scan_for_obsolete(self, *args) -> List[Dict[str, Any]]:
-        """Scan for obsolete entities."""
-        if self._scan_in_progress:
-            _LOGGER.warning("Scan already in progress, skipping")
-            return self._obsolete_entities
+        @callback
+        def _async_settled(_now: Any = None) -> None:
+            """Start tracking and run the first scan."""
+            self.async_start_tracking()
+            if scan:
+                self.hass.async_create_task(
+                    self._async_scan_quietly(), f"{DOMAIN} startup scan"
+                )
 
+        @callback
+        def _async_started(_hass: HomeAssistant) -> None:
+            """Wait for the settle delay."""
+            if delay:
+                _LOGGER.debug(f"Home Assistant started, first scan in {delay}s")
+                self._unsub_listeners.append(
+                    async_call_later(self.hass, delay, _async_settled)
+                )
+            else:
+                _async_settled()
+
+        self._unsub_listeners.append(async_at_started(self.hass, _async_started))
+
+    @callback
+    def async_start_tracking(self) -> None:
+        """Listen for registry and config entry changes.
+
+        Entries that failed to load while Home Assistant was starting
+        changed state before anything listened, so the entities of every
+        entry not loaded by now are re-checked as well.
+        """
+        for entry in self.hass.config_entries.async_entries():
+            if (
+                entry.state is not ConfigEntryState.LOADED
+                and entry.entry_id != self.config_entry.entry_id
+            ):
+                self._mark_config_entry_dirty(entry.entry_id)
+        self._unsub_listeners.extend(
+            [
+                self.hass.bus.async_listen(
+                    er.EVENT_ENTITY_REGISTRY_UPDATED,
+                    self._handle_entity_registry_updated,
+                ),
+                self.hass.bus.async_listen(
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                    self._handle_device_registry_updated,
+                ),
+                async_dispatcher_connect(
+                    self.hass,
+                    SIGNAL_CONFIG_ENTRY_CHANGED,
+                    self._handle_config_entry_changed,
+                ),
+            ]
+        )
+        if self._dirty_entity_ids:
+            self._rescan_debouncer.async_schedule_call()
+
+    @property
+    def _scan_interval(self) -> float:
+        """Return the configured full scan interval in seconds."""
+        return self.config_entry.options.get(
+            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+        ) * 60
+
+    @callback
+    def async_update_schedule(self) -> None:
+        """Apply changed auto scan and scan interval options to the schedule.
+
+        A changed interval only rebuilds the pending timer; the backoff
+        factor and the churn counted since the last scan are kept.
+        """
+        if not self.config_entry.options.get(CONF_AUTO_SCAN, False):
+            self._async_cancel_scheduled_scan()
+            self._scan_interval_factor = None
+        elif self._scan_in_progress:
+            return
+        elif self._unsub_scheduled_scan is None:
+            self._async_schedule_scan()
+        elif self._scan_interval != self._scheduled_scan_interval:
+            self._scheduled_scan_interval = self._scan_interval
+            self._async_schedule_scan_in(
+                self._scan_interval * (self._scan_interval_factor or 1.0)
+            )
+
+    @callback
+    def _async_schedule_scan(self) -> None:
+        """Schedule the next periodic full scan from the churn since the last.
+
+        The configured interval doubles for every scan that found the entity
+        registry unchanged, up to SCAN_BACKOFF_MAX_FACTOR times, and returns
+        to the configured value once entities change again. A removed
+        integration shortens it to SCAN_BURST_INTERVAL_FACTOR.
+        """
+        if not self.config_entry.options.get(CONF_AUTO_SCAN, False):
+            return
+
+        factor = self._scan_interval_factor
+        if factor is None:
+            factor = 1.0
+        elif self._integrations_removed:
+            factor = SCAN_BURST_INTERVAL_FACTOR
+        elif self._registry_changes:
+            factor = 1.0
+        else:
+            factor = min(factor * 2, SCAN_BACKOFF_MAX_FACTOR)
+        _LOGGER.debug(
+            f"{self._registry_changes} registry changes and "
+            f"{self._integrations_removed} removed integrations since the last "
+            f"scan, scan interval factor {factor}"
+        )
+        self._scan_interval_factor = factor
+        self._scheduled_scan_interval = self._scan_interval
+        self._registry_changes = self._integrations_removed = 0
+        self._async_schedule_scan_in(self._scan_interval * factor)
+
+    @callback
+    def _async_schedule_scan_in(self, delay: float) -> None:
+        """Replace the scheduled full scan with one after delay seconds."""
+        self._async_cancel_scheduled_scan()
+        self._next_scheduled_scan = dt_util.utcnow() + timedelta(seconds=delay)
+        self._unsub_scheduled_scan = async_call_later(
+            self.hass, delay, self._async_run_scheduled_scan
+        )
+        _LOGGER.debug(f"Next full scan at {self._next_scheduled_scan}")
+
+    @callback
+    def _async_cancel_scheduled_scan(self) -> None:
+        """Cancel the scheduled full scan, if any."""
+        if self._unsub_scheduled_scan is not None:
+            self._unsub_scheduled_scan()
+            self._unsub_scheduled_scan = None
+        self._next_scheduled_scan = None
+
+    @callback
+    def _async_run_scheduled_scan(self, _now: datetime) -> None:
+        """Run a periodic full scan; it schedules the next one when done."""
+        self._unsub_scheduled_scan = None
+        self._next_scheduled_scan = None
+        self.hass.async_create_task(
+            self._async_scan_quietly(), f"{DOMAIN} scheduled scan"
+        )
+
+    @callback
+    def _async_scan_soon(self) -> None:
+        """Bring a far-off scheduled scan forward after an integration removal.
+
+        Several removals in a row share the earlier scan. If a scan is
+        running, the next one is scheduled early when it finishes.
+        """
+        if self._next_scheduled_scan is None:
+            return
+        delay = self._scan_interval * SCAN_BURST_INTERVAL_FACTOR
+        if self._next_scheduled_scan > dt_util.utcnow() + timedelta(seconds=delay):
+            self._async_schedule_scan_in(delay)
+
+    @property
+    def schedule(self) -> Dict[str, Any]:
+        """Return the state of the periodic full scan schedule."""
+        next_scan = self._next_scheduled_scan
+        return {
+            "next_scan": next_scan.isoformat() if next_scan else None,
+            "interval_factor": self._scan_interval_factor,
+            "registry_changes": self._registry_changes,
+            "integrations_removed": self._integrations_removed,
+        }
+
+    async def async_shutdown(self) -> None:
+        """Stop listening for changes and cancel pending scans."""
+        self._shutting_down = True
+        while self._unsub_listeners:
+            self._unsub_listeners.pop()()
+        self._async_cancel_scheduled_scan()
+        if self._auto_clean_task is not None:
+            self._auto_clean_task.cancel()
+        if self._scan_task is not None:
+            self._scan_task.cancel()
+        self._rescan_debouncer.async_shutdown()
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._unsub_results_save is not None:
+            await self._async_save_results()
+        await super().async_shutdown()
+
+    @callback
+    def _handle_entity_registry_updated(self, event: Event) -> None:
+        """Mark an entity dirty after a registry change."""
+        self._registry_changes += 1
+        self._dirty_entity_ids.add(event.data["entity_id"])
+        if old_entity_id := event.data.get("old_entity_id"):
+            self._dirty_entity_ids.add(old_entity_id)
+        self._rescan_debouncer.async_schedule_call()
+
+    @callback
+    def _handle_device_registry_updated(self, event: Event) -> None:
+        """Mark the entities of a changed device dirty."""
+        entity_registry = async_get_entity_registry(self.hass)
+        self._dirty_entity_ids.update(
+            entry.entity_id
+            for entry in er.async_entries_for_device(
+                entity_registry, event.data["device_id"], True
+            )
+        )
+        self._rescan_debouncer.async_schedule_call()
+
+    @callback
+    def _handle_config_entry_changed(
+        self, change: ConfigEntryChange, entry: ConfigEntry
+    ) -> None:
+        """Mark the entities of a changed config entry dirty."""
+        if entry.entry_id == self.config_entry.entry_id:
+            return
+        if change is ConfigEntryChange.REMOVED:
+            self._integrations_removed += 1
+            self._async_scan_soon()
+        self._mark_config_entry_dirty(entry.entry_id)
+        self._rescan_debouncer.async_schedule_call()
+
+    @callback
+    def _mark_config_entry_dirty(self, entry_id: str) -> None:
+        """Mark the entities of a config entry and of its devices dirty."""
+        entity_registry = async_get_entity_registry(self.hass)
+        device_registry = async_get_device_registry(self.hass)
+        dirty = self._dirty_entity_ids
+        dirty.update(
+            entity.entity_id
+            for entity in er.async_entries_for_config_entry(entity_registry, entry_id)
+        )
+        for device in dr.async_entries_for_config_entry(device_registry, entry_id):
+            dirty.update(
+                entity.entity_id
+                for entity in er.async_entries_for_device(
+                    entity_registry, device.id, True
+                )
+            )
+
+    def _build_scan_context(
+        self, stats: Optional[OperationStats] = None
+    ) -> ScanContext:
+        """Snapshot options and config entry states for one pass."""
+        minimum_age_days = self.config_entry.options.get(
+            CONF_MINIMUM_AGE_DAYS, DEFAULT_MINIMUM_AGE_DAYS
+        )
+        pipeline = self._get_rule_pipeline()
+
+        return ScanContext(
+            async_get_device_registry(self.hass),
+            self.hass.states,
+            {
+                config_entry.entry_id: config_entry.state
+                for config_entry in self.hass.config_entries.async_entries()
+            },
+            dt_util.utcnow() - timedelta(days=minimum_age_days),
+            self._get_exclusions(),
+            pipeline.evaluator(
+                stats if stats is not None and stats.detailed else None
+            ),
+            self._last_changed if pipeline.has_rule("stale") else None,
+            self._stale_days,
+        )
+
+    @property
+    def _stale_days(self) -> int:
+        """Return after how many days without a state change an entity is stale."""
+        return self.config_entry.options.get(CONF_STALE_DAYS, DEFAULT_STALE_DAYS)
+
+    def _get_rule_pipeline(self) -> RulePipeline:
+        """Return the rule pipeline for the current options.
+
+        Measured hit rates carry over when rules are turned on or off.
+        """
+        rules = select_rules(
+            self.config_entry.options.get(CONF_ENABLED_RULES, []),
+            self.config_entry.options.get(CONF_DISABLED_RULES, []),
+        )
+        pipeline = self._rule_pipeline
+        if pipeline is None or pipeline.rules != rules:
+            pipeline = self._rule_pipeline = RulePipeline(
+                rules, pipeline.rates if pipeline else None
+            )
+        return pipeline
+
+    def _get_exclusions(self) -> ExclusionMatcher:
+        """Return the exclusions compiled from the current options.
+
+        Compiled again only when one of the exclusion options changed.
+        """
+        options = self.config_entry.options
+        exclusion_options = (
+            tuple(options.get(CONF_EXCLUDED_DOMAINS, DEFAULT_EXCLUDED_DOMAINS)),
+            tuple(options.get(CONF_EXCLUDED_ENTITIES, [])),
+            tuple(options.get(CONF_EXCLUDED_PLATFORMS, [])),
+            tuple(options.get(CONF_EXCLUDED_CONFIG_ENTRIES, [])),
+        )
+        if self._exclusions is None or exclusion_options != self._exclusion_options:
+            self._exclusions = ExclusionMatcher(*exclusion_options)
+            self._exclusion_options = exclusion_options
+        return self._exclusions
+
+    def _start_stats(self, operation: str) -> OperationStats:
+        """Start recording an operation; detailed when detailed logging is on."""
+        return OperationStats(
+            operation,
+            self.config_entry.options.get(CONF_DETAILED_LOGGING, False),
+        )
+
+    def _finish_stats(self, stats: OperationStats) -> None:
+        """Keep the stats of a finished operation."""
+        stats.finish()
+        self._operation_stats[stats.operation] = stats
+        if stats.detailed:
+            _LOGGER.debug(f"{stats.operation.title()} stats: {stats.as_dict()}")
+
+    def _evaluate_entity(
+        self, entity_id: str, entity: Any, context: ScanContext
+    ) -> Optional[ObsoleteEntity]:
+        """Return the obsolete record for an entity, or None if it is fine."""
+        reason = context.evaluate(entity_id, entity, context)
+        if not reason:
+            return None
+        return self._obsolete_record(entity_id, entity, reason)
+
+    @staticmethod
+    def _obsolete_record(entity_id: str, entity: Any, reason: str) -> ObsoleteEntity:
+        """Build the obsolete record of a registry entry."""
+        return ObsoleteEntity(
+            entity_id,
+            entity_id.split(".")[0],
+            entity.platform,
+            entity.device_id,
+            entity.config_entry_id,
+            getattr(entity, "created_at", None),
+            reason,
+            entity.name or entity.original_name,
+            entity.unique_id,
+        )
+
+    async def async_scan_for_obsolete(self, *args) -> List[ObsoleteEntity]:
+        """Scan for obsolete entities.
+
+        Callers arriving while a scan runs wait for that scan and get its
+        results instead of starting another one. Raises ScanCancelledError
+        if the scan is cancelled.
+        """
+        if self._scan_task is None or self._scan_task.done():
+            self._scan_cancel_requested = False
+            self._scan_task = self.hass.async_create_task(
+                self._async_scan_for_obsolete(), f"{DOMAIN} scan"
+            )
+        else:
+            _LOGGER.debug("Scan already in progress, waiting for its results")
+        # A caller that gives up must not cancel the scan for the others
+        return await asyncio.shield(self._scan_task)
+
+    async def _async_scan_quietly(self) -> None:
+        """Run a full scan nobody waits for; a cancelled scan is no error."""
+        with suppress(ScanCancelledError):
+            await self.async_scan_for_obsolete()
+
+    @callback
+    def async_cancel_scan(self) -> bool:
+        """Ask the running full scan to stop at its next chunk boundary.
+
+        The previous results are kept. Returns False if no scan is running.
+        """
+        if self._scan_task is None or self._scan_task.done():
+            return False
+        _LOGGER.info("Cancelling the running scan")
+        self._scan_cancel_requested = True
+        return True
+
+    def _check_scan_cancelled(self) -> None:
+        """Raise ScanCancelledError if the running scan should stop."""
+        if self._scan_cancel_requested:
+            raise ScanCancelledError("Scan cancelled")
+
+    async def _async_scan_for_obsolete(self) -> List[ObsoleteEntity]:
+        """Run one full scan; see async_scan_for_obsolete."""
         _LOGGER.info("Starting obsolete entity scan")
         self._scan_in_progress = True
-        
+        # Changes arriving from here on are picked up by the next rescan
+        dirty_entity_ids = self._dirty_entity_ids
+        self._dirty_entity_ids = set()
+        stats = self._start_stats("scan")
+
         try:
+            phase_started = time.perf_counter()
+            if self._get_rule_pipeline().has_rule("stale"):
+                # One grouped query for all entities, off the event loop
+                self._last_changed = await async_last_state_changes(
+                    self.hass, self._stale_days
+                )
+                phase_started = stats.add_time_since("history_query", phase_started)
+                self._check_scan_cancelled()
+
             entity_registry = async_get_entity_registry(self.hass)
-            device_registry = async_get_device_registry(self.hass)
-            
-            # Get configuration
-            minimum_age_days = self.config_entry.options.get(
-                CONF_MINIMUM_AGE_DAYS, DEFAULT_MINIMUM_AGE_DAYS
-            )
-            excluded_domains = self.config_entry.options.get(
-                CONF_EXCLUDED_DOMAINS, DEFAULT_EXCLUDED_DOMAINS
-            )
-            excluded_entities = self.config_entry.options.get(
-                CONF_EXCLUDED_ENTITIES, []
-            )
+            context = self._build_scan_context(stats)
+            obsolete_entities = ObsoleteIndex()
+            time_budget = self.config_entry.options.get(
+                CONF_SCAN_TIME_BUDGET_MS, DEFAULT_SCAN_TIME_BUDGET_MS
+            ) / 1000
 
-            cutoff_date = dt_util.utcnow() - timedelta(days=minimum_age_days)
-            obsolete_entities = []
+            # Copy only the ids so the registry may change while we yield;
+            # copying items would allocate a tuple per entity
+            registry_entities = entity_registry.entities
+            entity_ids = list(registry_entities)
+            total = len(entity_ids)
+            phase_started = stats.add_time_since("context", phase_started)
+            started = slice_started = progress_published = time.monotonic()
+            self._update_scan_progress(0, total, started)
+            self.async_set_updated_data(self._build_data())
+            phase_started = stats.add_time_since("progress_updates", phase_started)
+            visited = 0
+            evaluate = context.evaluate
 
-            for entity_id, entity in entity_registry.entities.items():
-                # Skip if entity is in excluded domains
-                domain = entity_id.split(".")[0]
-                if domain in excluded_domains:
+            for offset in range(0, total, SCAN_CHUNK_SIZE):
+                for entity_id in entity_ids[offset:offset + SCAN_CHUNK_SIZE]:
+                    entity = registry_entities.get(entity_id)
+                    if entity is None:
+                        continue  # Removed while the scan yielded
+                    visited += 1
+                    reason = evaluate(entity_id, entity, context)
+                    if reason:
+                        obsolete_entities[entity_id] = self._obsolete_record(
+                            entity_id, entity, reason
+                        )
+                phase_started = stats.add_time_since(
+                    "registry_iteration", phase_started
+                )
+
+                if not time_budget:
                     continue
 
-                # Skip if entity is explicitly excluded
-                if entity_id in excluded_entities:
+                now = time.monotonic()
+                if now - slice_started < time_budget:
                     continue
 
-                # Check if entity is obsolete
-                is_obsolete = False
-                reason = ""
-
-                # Check if device exists but is obsolete
-                if entity.device_id:
-                    device = device_registry.devices.get(entity.device_id)
-                    if not device:
-                        is_obsolete = True
-                        reason = "Device not found"
-                    elif not device.config_entries:
-                        is_obsolete = True
-                        reason = "Device has no config entries"
-                    elif not any(
-                        entry_id in self.hass.config_entries.async_entries()
-                        for entry_id in device.config_entries
-                    ):
-                        is_obsolete = True
-                        reason = "Device config entries not loaded"
-
-                # Check if config entry exists
-                elif entity.config_entry_id:
-                    config_entry = self.hass.config_entries.async_get_entry(
-                        entity.config_entry_id
-                    )
-                    if not config_entry:
-                        is_obsolete = True
-                        reason = "Config entry not found"
-                    elif config_entry.state.name != "loaded":
-                        is_obsolete = True
-                        reason = f"Config entry state: {config_entry.state.name}"
-
-                # Check if entity is old enough
-                if is_obsolete and entity.created_at:
-                    if entity.created_at > cutoff_date:
-                        continue  # Too new, skip
-
-                # Check if entity actually exists in Home Assistant
-                if is_obsolete:
-                    state = self.hass.states.get(entity_id)
-                    if state is not None:
-                        # Entity has state, might not be obsolete
-                        continue
+                processed = min(offset + SCAN_CHUNK_SIZE, total)
+                self._update_scan_progress(processed, total, started)
+                if now - progress_published >= SCAN_PROGRESS_INTERVAL:
+                    progress_published = now
+                    self.async_update_listeners()
+                phase_started = stats.add_time_since(
+                    "progress_updates", phase_started
+                )
+
+                # Give the event loop back before starting the next slice
+                await asyncio.sleep(0)
+                stats.count("yields")
+                phase_started = stats.add_time_since("yielded", phase_started)
+                slice_started = time.monotonic()
+                self._check_scan_cancelled()
+
+            self._update_scan_progress(total, total, started)
 
-                if is_obsolete:
-                    obsolete_entities.append({
-                        "entity_id": entity_id,
-                        "domain": domain,
-                        "platform": entity.platform,
-                        "device_id": entity.device_id,
-                        "config_entry_id": entity.config_entry_id,
-                        "created_at": entity.created_at.isoformat() if entity.created_at else None,
-                        "reason": reason,
-                        "name": entity.name or entity.original_name,
-                        "unique_id": entity.unique_id,
-                    })
+            # Re-measure rule hit rates on a spread-out sample so the next
+            # pass checks the most decisive rules first
+            stride = max(total // RULE_SAMPLE_SIZE, 1)
+            self._get_rule_pipeline().measure(
+                (
+                    (entity_id, registry_entities[entity_id])
+                    for entity_id in entity_ids[::stride]
+                    if entity_id in registry_entities
+                ),
+                context,
+            )
+            phase_started = stats.add_time_since("rule_sampling", phase_started)
 
+            previous_entities = self._obsolete_entities
             self._obsolete_entities = obsolete_entities
             self._last_scan = dt_util.utcnow()
+            self._generation += 1
+            self._async_publish_delta(
+                ScanDelta.between(
+                    self._generation,
+                    "scan",
+                    previous_entities.keys(),
+                    obsolete_entities.keys(),
+                )
+            )
+            self._schedule_results_save()
+            self._async_start_auto_clean(total)
+            stats.count("visited", visited)
+            stats.count("obsolete", len(obsolete_entities))
+            stats.reasons = obsolete_entities.counts("reason")
             
             _LOGGER.info(f"Scan completed. Found {len(obsolete_entities)} obsolete entities")
             
             # Fire event
+            phase_started = time.perf_counter()
             self.hass.bus.fire(
                 "entity_janitor_obsolete_found",
                 {
@@ -166,17 +864,150 @@ class EntityJanitorCoordinator(DataUpdateCoordinator):
                     "total_entities": len(entity_registry.entities),
                 }
             )
+            self._async_fire_details("scan", obsolete_entities.keys())
+            stats.add_time_since("event_firing", phase_started)
 
-            return obsolete_entities
+            return self.obsolete_entities
 
+        except ScanCancelledError:
+            _LOGGER.info("Scan cancelled, keeping the previous results")
+            stats.count("cancelled")
+            # The old results stay, so the changes they miss still need a rescan
+            self._dirty_entity_ids |= dirty_entity_ids
+            raise
         except Exception as ex:
             _LOGGER.error(f"Error during obsolete scan: {ex}")
             raise
         finally:
             self._scan_in_progress = False
-            # Request data refresh to update sensors
-            await self.async_request_refresh()
-            self.async_update_listeners()
+            self._scan_progress = None
+            self._finish_stats(stats)
+            if not self._shutting_down:
+                self._async_schedule_scan()
+                if self._dirty_entity_ids:
+                    self._rescan_debouncer.async_schedule_call()
+            # Publish the new results to sensors once
+            self.async_set_updated_data(self._build_data())
+
+    @callback
+    def _async_fire_details(self, operation: str, entity_ids: Iterable[str]) -> None:
+        """Publish the entity ids of a result as a series of chunk events.
+
+        Only with the detail events option on; the ids are only copied
+        then. Chunks carry a sequence number, the chunk count and a final
+        marker; operation and generation tell which result they belong to.
+        """
+        if not self.config_entry.options.get(CONF_DETAIL_EVENTS, False):
+            return
+        entity_ids = list(entity_ids)
+        total = len(entity_ids)
+        chunks = max(-(-total // DETAIL_EVENT_CHUNK_SIZE), 1)
+        for seq in range(chunks):
+            offset = seq * DETAIL_EVENT_CHUNK_SIZE
+            self.hass.bus.async_fire(
+                EVENT_DETAILS,
+                {
+                    "operation": operation,
+                    "generation": self._generation,
+                    "seq": seq,
+                    "chunks": chunks,
+                    "final": seq == chunks - 1,
+                    "total": total,
+                    "entity_ids": entity_ids[offset:offset + DETAIL_EVENT_CHUNK_SIZE],
+                },
+            )
+
+    @callback
+    def _async_publish_delta(self, delta: ScanDelta) -> None:
+        """Keep a change of the obsolete results and fire it as an event.
+
+        Passes that changed nothing are neither kept nor fired.
+        """
+        if not delta:
+            return
+        self._deltas.append(delta)
+        _LOGGER.debug(f"Obsolete results changed: {delta!r}")
+        self.hass.bus.async_fire(
+            EVENT_OBSOLETE_CHANGED, delta.as_dict(DELTA_EVENT_MAX_IDS)
+        )
+
+    def _update_scan_progress(
+        self, processed: int, total: int, started: float
+    ) -> None:
+        """Record how far the running scan has got and when it should finish."""
+        elapsed = time.monotonic() - started
+        eta = None
+        if processed:
+            eta = round(elapsed / processed * (total - processed), 1)
+        self._scan_progress = {
+            "processed": processed,
+            "total": total,
+            "percent": round(processed / total * 100, 1) if total else 100.0,
+            "eta_seconds": eta,
+        }
+
+    async def async_rescan_dirty(self) -> None:
+        """Re-check only the entities touched since the last pass."""
+        if self._scan_in_progress or not self._dirty_entity_ids:
+            return
+
+        if self._last_changed is None and self._get_rule_pipeline().has_rule("stale"):
+            # Restored stale verdicts would be dropped without the history
+            self._last_changed = await async_last_state_changes(
+                self.hass, self._stale_days
+            )
+            if self._scan_in_progress:
+                return
+
+        dirty_entity_ids = self._dirty_entity_ids
+        self._dirty_entity_ids = set()
+
+        entity_registry = async_get_entity_registry(self.hass)
+        context = self._build_scan_context()
+        obsolete_entities = self._obsolete_entities
+        changed = False
+        added: List[str] = []
+        removed: List[str] = []
+
+        for entity_id in dirty_entity_ids:
+            entity = entity_registry.entities.get(entity_id)
+            record = (
+                self._evaluate_entity(entity_id, entity, context)
+                if entity is not None
+                else None
+            )
+            if record is not None:
+                previous = obsolete_entities.get(entity_id)
+                if previous is None:
+                    added.append(entity_id)
+                changed |= previous != record
+                obsolete_entities[entity_id] = record
+            elif obsolete_entities.pop(entity_id, None) is not None:
+                removed.append(entity_id)
+                changed = True
+
+        _LOGGER.debug(
+            f"Incremental rescan checked {len(dirty_entity_ids)} entities, "
+            f"{len(obsolete_entities)} obsolete"
+        )
+        # The results now match the registry again, so refresh the fingerprint
+        self._schedule_results_save()
+        if changed:
+            self._generation += 1
+            self._async_publish_delta(
+                ScanDelta(
+                    self._generation,
+                    "rescan",
+                    sorted(added),
+                    sorted(removed),
+                    len(obsolete_entities) - len(added),
+                )
+            )
+        # Without polling, this also keeps the entity total current
+        if changed or self.data.get("total_entities") != len(
+            entity_registry.entities
+        ):
+            self.async_set_updated_data(self._build_data())
 
     async def async_clean_obsolete(
         self, 
@@ -186,17 +1017,49 @@ class EntityJanitorCoordinator(DataUpdateCoordinator):
     ) -> Dict[str, Any]:
         """Clean obsolete entities."""
         _LOGGER.info(f"Starting obsolete cleanup (dry_run={dry_run})")
-        
+        stats = self._start_stats("clean")
+        try:
+            return await self._async_clean_obsolete(
+                entity_ids, dry_run, backup_before_clean, stats
+            )
+        finally:
+            self._finish_stats(stats)
+            self.async_update_listeners()
+
+    async def _async_clean_obsolete(
+        self,
+        entity_ids: Optional[List[str]],
+        dry_run: bool,
+        backup_before_clean: bool,
+        stats: OperationStats,
+    ) -> Dict[str, Any]:
+        """Clean obsolete entities, recording each phase in stats."""
+        phase_started = time.perf_counter()
+        if self._scan_task is not None and not self._scan_task.done():
+            # Select from the results of the running scan, not the ones it
+            # replaces; a cancelled scan keeps the previous results
+            with suppress(ScanCancelledError):
+                await self.async_scan_for_obsolete()
+            phase_started = stats.add_time_since("scan", phase_started)
+        elif entity_ids is None and self._last_scan is None:
+            # Scan only if there are no results at all, saved ones included
+            await self.async_scan_for_obsolete()
+            phase_started = stats.add_time_since("scan", phase_started)
+
         # If no specific entities provided, use all obsolete entities
         if entity_ids is None:
-            if not self._obsolete_entities:
-                await self.async_scan_for_obsolete()
-            entities_to_clean = self._obsolete_entities
+            entities_to_clean = self.obsolete_entities
         else:
+            obsolete_entities = self._obsolete_entities
             entities_to_clean = [
-                entity for entity in self._obsolete_entities
-                if entity["entity_id"] in entity_ids
+                obsolete_entities[entity_id]
+                for entity_id in dict.fromkeys(entity_ids)
+                if entity_id in obsolete_entities
             ]
+        phase_started = stats.add_time_since("select", phase_started)
+        stats.count("selected", len(entities_to_clean))
+        for entity in entities_to_clean:
+            stats.reasons[entity.reason] = stats.reasons.get(entity.reason, 0) + 1
 
         if not entities_to_clean:
             return {"cleaned_count": 0, "skipped_count": 0, "backup_file": None}
@@ -204,43 +1067,32 @@ class EntityJanitorCoordinator(DataUpdateCoordinator):
         backup_file = None
         if backup_before_clean and not dry_run:
             backup_file = await self.async_backup_entities(entities_to_clean)
+            phase_started = stats.add_time_since("backup", phase_started)
 
         cleaned_count = 0
         skipped_count = 0
         
         if not dry_run:
-            entity_registry = async_get_entity_registry(self.hass)
-            
-            for entity_data in entities_to_clean:
-                entity_id = entity_data["entity_id"]
-                try:
-                    if entity_id in entity_registry.entities:
-                        entity_registry.async_remove(entity_id)
-                        cleaned_count += 1
-                        _LOGGER.info(f"Removed obsolete entity: {entity_id}")
-                    else:
-                        skipped_count += 1
-                        _LOGGER.warning(f"Entity not found in registry: {entity_id}")
-                except Exception as ex:
-                    _LOGGER.error(f"Error removing entity {entity_id}: {ex}")
-                    skipped_count += 1
-
-            # Update our internal list
-            remaining_entities = [
-                entity for entity in self._obsolete_entities
-                if entity["entity_id"] not in [e["entity_id"] for e in entities_to_clean]
-            ]
-            self._obsolete_entities = remaining_entities
+            cleaned_ids, skipped_count = await self._async_remove_entities(
+                [entity.entity_id for entity in entities_to_clean]
+            )
+            cleaned_count = len(cleaned_ids)
+            stats.count("cleaned", cleaned_count)
+            stats.count("skipped", skipped_count)
+            phase_started = stats.add_time_since("remove", phase_started)
+            self.async_set_updated_data(self._build_data())
 
             # Fire event
             self.hass.bus.fire(
-                "entity_janitor_cleanup_complete",
+                EVENT_CLEANUP_COMPLETE,
                 {
                     "cleaned_count": cleaned_count,
                     "skipped_count": skipped_count,
                     "backup_file": backup_file,
                 }
             )
+            self._async_fire_details("clean", cleaned_ids)
+            stats.add_time_since("event_firing", phase_started)
 
         result = {
             "cleaned_count": cleaned_count if not dry_run else 0,
@@ -253,34 +1105,713 @@ class EntityJanitorCoordinator(DataUpdateCoordinator):
         _LOGGER.info(f"Cleanup completed: {result}")
         return result
 
+    @callback
+    def _async_start_auto_clean(self, total: int) -> None:
+        """Start removing confirmed obsolete entities after a full scan.
+
+        Confirmed entities were flagged by this scan and the previous one.
+        If this scan flagged more than the allowed share of the registry,
+        the circuit breaker stops any running auto clean and alerts instead.
+        """
+        options = self.config_entry.options
+        if not options.get(CONF_AUTO_CLEAN, False):
+            self._previous_obsolete_ids = set()
+            return
+
+        obsolete_entities = self._obsolete_entities
+        previous = self._previous_obsolete_ids
+        self._previous_obsolete_ids = set(obsolete_entities.keys())
+
+        max_percent = options.get(
+            CONF_AUTO_CLEAN_MAX_PERCENT, DEFAULT_AUTO_CLEAN_MAX_PERCENT
+        )
+        percent = round(len(obsolete_entities) / max(total, 1) * 100, 2)
+        if percent > max_percent:
+            self._async_trip_auto_clean_breaker(
+                len(obsolete_entities), total, percent, max_percent
+            )
+            return
+
+        if self._auto_clean_task is not None and not self._auto_clean_task.done():
+            _LOGGER.debug("Auto clean still running, skipping")
+            return
+        confirmed = [
+            entity_id for entity_id in obsolete_entities.keys() if entity_id in previous
+        ]
+        if not confirmed:
+            return
+        self._auto_clean_task = self.config_entry.async_create_background_task(
+            self.hass, self._async_auto_clean(confirmed), f"{DOMAIN} auto clean"
+        )
+
+    @callback
+    def _async_trip_auto_clean_breaker(
+        self, obsolete_count: int, total: int, percent: float, max_percent: float
+    ) -> None:
+        """Stop auto clean because a scan flagged an abnormal share of entities."""
+        if self._auto_clean_task is not None and not self._auto_clean_task.done():
+            self._auto_clean_task.cancel()
+        message = (
+            f"The last scan flagged {obsolete_count} of {total} entities "
+            f"({percent}%), more than the {max_percent}% auto clean allows. "
+            "This usually means an integration failed to load. Nothing was "
+            "removed; check the results and clean manually if they are right."
+        )
+        _LOGGER.warning(f"Auto clean stopped: {message}")
+        self.hass.bus.async_fire(
+            EVENT_AUTO_CLEAN_BLOCKED,
+            {
+                "obsolete_count": obsolete_count,
+                "total_entities": total,
+                "obsolete_percent": percent,
+                "max_percent": max_percent,
+            },
+        )
+        if self.config_entry.options.get(CONF_NOTIFICATIONS_ENABLED, True):
+            persistent_notification.async_create(
+                self.hass,
+                message,
+                title="Entity Janitor auto clean stopped",
+                notification_id=f"{DOMAIN}_auto_clean_blocked",
+            )
+
+    async def _async_auto_clean(self, entity_ids: List[str]) -> None:
+        """Remove entities in batches, at most auto_clean_rate per minute.
+
+        Follows the dry run and backup before clean options. Entities that
+        are no longer obsolete when their batch is due are skipped.
+        """
+        options = self.config_entry.options
+        dry_run = options.get(CONF_DRY_RUN_MODE, False)
+        rate = options.get(CONF_AUTO_CLEAN_RATE, DEFAULT_AUTO_CLEAN_RATE)
+        batch_size = max(min(CLEAN_BATCH_SIZE, rate), 1)
+        batch_delay = 60 * batch_size / rate
+        _LOGGER.info(
+            f"Auto clean of {len(entity_ids)} confirmed obsolete entities "
+            f"(dry_run={dry_run}, {rate} per minute)"
+        )
+
+        stats = self._start_stats("auto_clean")
+        stats.count("selected", len(entity_ids))
+        backup_file = None
+        cleaned_ids: List[str] = []
+        skipped_count = 0
+        try:
+            phase_started = time.perf_counter()
+            if not dry_run and options.get(CONF_BACKUP_BEFORE_CLEAN, True):
+                backup_file = await self.async_backup_entities(
+                    self.query_obsolete(entity_ids)
+                )
+                phase_started = stats.add_time_since("backup", phase_started)
+
+            to_remove = [] if dry_run else entity_ids
+            for offset in range(0, len(to_remove), batch_size):
+                if offset:
+                    await asyncio.sleep(batch_delay)
+                    phase_started = stats.add_time_since("throttled", phase_started)
+                # A scan or rescan may have cleared entities while we waited
+                chunk = to_remove[offset:offset + batch_size]
+                batch = [
+                    entity_id for entity_id in chunk
+                    if entity_id in self._obsolete_entities
+                ]
+                skipped_count += len(chunk) - len(batch)
+                if not batch:
+                    continue
+                cleaned, skipped = await self._async_remove_entities(batch)
+                cleaned_ids.extend(cleaned)
+                skipped_count += skipped
+                phase_started = stats.add_time_since("remove", phase_started)
+                self.async_set_updated_data(self._build_data())
+        finally:
+            stats.count("cleaned", len(cleaned_ids))
+            stats.count("skipped", skipped_count)
+            self._finish_stats(stats)
+            self.async_update_listeners()
+
+        result = {
+            "cleaned_count": len(cleaned_ids),
+            "skipped_count": skipped_count,
+            "backup_file": backup_file,
+            "dry_run": dry_run,
+            "would_clean": len(entity_ids) if dry_run else 0,
+            "auto_clean": True,
+        }
+        _LOGGER.info(f"Auto clean completed: {result}")
+        if not dry_run:
+            self.hass.bus.async_fire(EVENT_CLEANUP_COMPLETE, result)
+            self._async_fire_details("auto_clean", cleaned_ids)
+
+    async def _async_find_orphaned_devices(
+        self, stats: OperationStats
+    ) -> Dict[str, OrphanedDevice]:
+        """Judge every device against a fresh device to entities index.
+
+        Yields to the event loop whenever a slice of the scan time budget
+        is used up, like the entity scan.
+        """
+        options = self.config_entry.options
+        minimum_age_days = options.get(
+            CONF_MINIMUM_AGE_DAYS, DEFAULT_MINIMUM_AGE_DAYS
+        )
+        time_budget = options.get(
+            CONF_SCAN_TIME_BUDGET_MS, DEFAULT_SCAN_TIME_BUDGET_MS
+        ) / 1000
+        entity_registry = async_get_entity_registry(self.hass)
+        device_registry = async_get_device_registry(self.hass)
+        scan = DeviceScan(
+            {entry.entry_id for entry in self.hass.config_entries.async_entries()},
+            dt_util.utcnow() - timedelta(days=minimum_age_days),
+            self._get_exclusions(),
+        )
+
+        # Copy the entries so the registries may change while we yield
+        entities = list(entity_registry.entities.values())
+        devices = list(device_registry.devices.values())
+        parents = {device.via_device_id for device in devices if device.via_device_id}
+        passes = (
+            ("index", scan.index_entities, entities),
+            ("judge", lambda chunk: scan.judge_devices(chunk, parents), devices),
+        )
+
+        phase_started = time.perf_counter()
+        slice_started = time.monotonic()
+        for phase, run, items in passes:
+            for offset in range(0, len(items), SCAN_CHUNK_SIZE):
+                run(items[offset:offset + SCAN_CHUNK_SIZE])
+                if not time_budget or time.monotonic() - slice_started < time_budget:
+                    continue
+                phase_started = stats.add_time_since(phase, phase_started)
+                await asyncio.sleep(0)
+                stats.count("yields")
+                phase_started = stats.add_time_since("yielded", phase_started)
+                slice_started = time.monotonic()
+            phase_started = stats.add_time_since(phase, phase_started)
+
+        stats.count("devices", len(devices))
+        stats.count("orphaned", len(scan.orphaned))
+        for device in scan.orphaned.values():
+            stats.reasons[device.reason] = stats.reasons.get(device.reason, 0) + 1
+        return scan.orphaned
+
+    async def async_scan_devices(self) -> List[OrphanedDevice]:
+        """Scan the device registry for orphaned devices."""
+        stats = self._start_stats("device_scan")
+        try:
+            self._orphaned_devices = await self._async_find_orphaned_devices(stats)
+            self._last_device_scan = dt_util.utcnow()
+        finally:
+            self._finish_stats(stats)
+        _LOGGER.info(
+            f"Device scan completed. Found {len(self._orphaned_devices)} "
+            "orphaned devices"
+        )
+        self.async_set_updated_data(self._build_data())
+        return self.orphaned_devices
+
+    async def async_clean_devices(
+        self,
+        device_ids: Optional[List[str]] = None,
+        dry_run: bool = True,
+        backup_before_clean: bool = True,
+    ) -> Dict[str, Any]:
+        """Remove orphaned devices, and the entities left on them."""
+        _LOGGER.info(f"Starting device cleanup (dry_run={dry_run})")
+        stats = self._start_stats("device_clean")
+        try:
+            return await self._async_clean_devices(
+                device_ids, dry_run, backup_before_clean, stats
+            )
+        finally:
+            self._finish_stats(stats)
+            self.async_update_listeners()
+
+    async def _async_clean_devices(
+        self,
+        device_ids: Optional[List[str]],
+        dry_run: bool,
+        backup_before_clean: bool,
+        stats: OperationStats,
+    ) -> Dict[str, Any]:
+        """Remove orphaned devices, recording each phase in stats."""
+        # Judge again: removing a device also removes the entities on it, so
+        # a device that gained entities since the last scan must be kept
+        orphaned = await self._async_find_orphaned_devices(stats)
+        self._orphaned_devices = orphaned
+        self._last_device_scan = dt_util.utcnow()
+
+        phase_started = time.perf_counter()
+        if device_ids is None:
+            devices_to_clean = self.orphaned_devices
+        else:
+            devices_to_clean = [
+                orphaned[device_id]
+                for device_id in dict.fromkeys(device_ids)
+                if device_id in orphaned
+            ]
+        phase_started = stats.add_time_since("select", phase_started)
+        stats.count("selected", len(devices_to_clean))
+        entity_count = sum(len(device.entity_ids) for device in devices_to_clean)
+
+        backup_file = None
+        if devices_to_clean and backup_before_clean and not dry_run:
+            backup_file = await self.async_backup_devices(devices_to_clean)
+            phase_started = stats.add_time_since("backup", phase_started)
+
+        removed_count = 0
+        skipped_count = 0
+
+        if devices_to_clean and not dry_run:
+            device_registry = async_get_device_registry(self.hass)
+            removed_ids, skipped_count = await self._async_remove_batched(
+                [device.device_id for device in devices_to_clean],
+                device_registry.devices,
+                device_registry.async_remove_device,
+                "devices",
+            )
+            removed_count = len(removed_ids)
+            for device in devices_to_clean:
+                orphaned.pop(device.device_id, None)
+            stats.count("removed", removed_count)
+            stats.count("skipped", skipped_count)
+            phase_started = stats.add_time_since("remove", phase_started)
+
+            self.hass.bus.async_fire(
+                EVENT_DEVICE_CLEANUP_COMPLETE,
+                {
+                    "removed_count": removed_count,
+                    "skipped_count": skipped_count,
+                    "entity_count": entity_count,
+                    "backup_file": backup_file,
+                },
+            )
+            stats.add_time_since("event_firing", phase_started)
+
+        self.async_set_updated_data(self._build_data())
+        result = {
+            "removed_count": removed_count,
+            "skipped_count": skipped_count,
+            "entity_count": entity_count,
+            "backup_file": backup_file,
+            "dry_run": dry_run,
+            "would_remove": len(devices_to_clean) if dry_run else 0,
+        }
+        _LOGGER.info(f"Device cleanup completed: {result}")
+        return result
+
+    async def _async_remove_entities(
+        self, entity_ids: List[str]
+    ) -> Tuple[List[str], int]:
+        """Remove entities from the registry in batches.
+
+        Returns the removed entity ids and the skipped count.
+        """
+        entity_registry = async_get_entity_registry(self.hass)
+        obsolete_entities = self._obsolete_entities
+        removed = [
+            entity_id
+            for entity_id in entity_ids
+            if obsolete_entities.pop(entity_id, None) is not None
+        ]
+        if removed:
+            self._generation += 1
+            self._async_publish_delta(
+                ScanDelta(
+                    self._generation,
+                    "clean",
+                    [],
+                    sorted(removed),
+                    len(obsolete_entities),
+                )
+            )
+
+        result = await self._async_remove_batched(
+            entity_ids,
+            entity_registry.entities,
+            entity_registry.async_remove,
+            "entities",
+        )
+        self._schedule_results_save()
+        return result
+
+    async def _async_remove_batched(
+        self,
+        ids: List[str],
+        registered: Container[str],
+        remove: Callable[[str], None],
+        kind: str,
+    ) -> Tuple[List[str], int]:
+        """Remove registry items in batches that yield to the event loop.
+
+        Returns the removed ids and the skipped count, where skipped covers
+        items no longer registered and items whose removal failed.
+        """
+        missing: List[str] = []
+        failed: Dict[str, str] = {}
+        removed: List[str] = []
+        total = len(ids)
+
+        for offset in range(0, total, CLEAN_BATCH_SIZE):
+            for item_id in ids[offset:offset + CLEAN_BATCH_SIZE]:
+                if item_id not in registered:
+                    missing.append(item_id)
+                    continue
+                try:
+                    remove(item_id)
+                except Exception as ex:
+                    failed[item_id] = str(ex)
+                    continue
+                removed.append(item_id)
+
+            _LOGGER.debug(
+                f"Cleanup progress: {min(offset + CLEAN_BATCH_SIZE, total)}/{total} "
+                f"processed, {len(removed)} removed"
+            )
+            # Let the event loop breathe between batches
+            await asyncio.sleep(0)
+
+        _LOGGER.info(f"Removed {len(removed)} obsolete {kind}")
+        if missing:
+            _LOGGER.warning(
+                f"{len(missing)} {kind} were no longer in the registry: "
+                f"{', '.join(missing[:LOG_SAMPLE_SIZE])}"
+            )
+        if failed:
+            _LOGGER.error(
+                f"Error removing {len(failed)} {kind}: "
+                + ", ".join(
+                    f"{item_id} ({error})"
+                    for item_id, error in list(failed.items())[:LOG_SAMPLE_SIZE]
+                )
+            )
+
+        return removed, len(missing) + len(failed)
+
     async def async_backup_entities(
-        self, entities: List[Dict[str, Any]]
+        self,
+        entities: List[ObsoleteEntity],
+        backup_format: Optional[str] = None,
     ) -> str:
         """Backup entities to a file."""
+        return await self._async_write_backup(
+            "entity_janitor_backup", "entities", entities, backup_format
+        )
+
+    async def async_backup_devices(
+        self,
+        devices: List[OrphanedDevice],
+        backup_format: Optional[str] = None,
+    ) -> str:
+        """Backup devices, with the ids of their entities, to a file."""
+        return await self._async_write_backup(
+            "entity_janitor_device_backup", "devices", devices, backup_format
+        )
+
+    async def _async_write_backup(
+        self,
+        prefix: str,
+        kind: str,
+        records: List[Any],
+        backup_format: Optional[str],
+    ) -> str:
+        """Write records to a timestamped backup and return its file name.
+
+        The store format returns the path of the backup's manifest.
+        """
+        if backup_format is None:
+            backup_format = self.config_entry.options.get(
+                CONF_BACKUP_FORMAT, DEFAULT_BACKUP_FORMAT
+            )
         timestamp = dt_util.utcnow().strftime("%Y%m%d_%H%M%S")
-        backup_file = f"entity_janitor_backup_{timestamp}.json"
-        backup_path = self.hass.config.path(backup_file)
+        if backup_format == BACKUP_FORMAT_STORE:
+            return await self._async_write_store_backup(
+                prefix, kind, records, timestamp
+            )
 
-        backup_data = {
-            "timestamp": timestamp,
-            "entities": entities,
-            "total_count": len(entities),
-        }
+        backup_file = f"{prefix}_{timestamp}{BACKUP_FORMAT_EXTENSIONS[backup_format]}"
+        backup_path = self.hass.config.path(backup_file)
 
         try:
-            with open(backup_path, "w", encoding="utf-8") as file:
-                json.dump(backup_data, file, indent=2, ensure_ascii=False)
+            if backup_format == BACKUP_FORMAT_NDJSON:
+                await async_write_ndjson_gz(
+                    self.hass,
+                    backup_path,
+                    {"timestamp": timestamp, "total_count": len(records)},
+                    records,
+                )
+            else:
+                await async_write_json(
+                    self.hass,
+                    backup_path,
+                    {
+                        "timestamp": timestamp,
+                        kind: records,
+                        "total_count": len(records),
+                    },
+                )
             
-            _LOGGER.info(f"Backed up {len(entities)} entities to {backup_file}")
+            _LOGGER.info(f"Backed up {len(records)} {kind} to {backup_file}")
             return backup_file
         except Exception as ex:
             _LOGGER.error(f"Error creating backup: {ex}")
             raise
 
+    async def _async_write_store_backup(
+        self, prefix: str, kind: str, records: List[Any], timestamp: str
+    ) -> str:
+        """Add records to the backup store and apply the retention."""
+        options = self.config_entry.options
+        try:
+            async with self._backup_lock:
+                manifest, new_count = await self.hass.async_add_executor_job(
+                    self._backup_store.write, prefix, kind, records, timestamp
+                )
+                pruned = await self.hass.async_add_executor_job(
+                    self._backup_store.prune,
+                    prefix,
+                    options.get(
+                        CONF_BACKUP_RETENTION_COUNT, DEFAULT_BACKUP_RETENTION_COUNT
+                    ),
+                    options.get(
+                        CONF_BACKUP_RETENTION_DAYS, DEFAULT_BACKUP_RETENTION_DAYS
+                    ),
+                )
+        except Exception as ex:
+            _LOGGER.error(f"Error creating backup: {ex}")
+            raise
+
+        backup_file = f"{BACKUP_STORE_DIR}/{manifest}"
+        _LOGGER.info(
+            f"Backed up {len(records)} {kind} to {backup_file} "
+            f"({new_count} not stored before)"
+        )
+        if pruned:
+            _LOGGER.debug(f"Deleted {pruned} {kind} backups beyond the retention")
+        return backup_file
+
+    def _resolve_backup_path(self, backup_file: str) -> str:
+        """Return the absolute path of a backup inside the config directory."""
+        config_dir = os.path.realpath(self.hass.config.config_dir)
+        backup_path = os.path.realpath(self.hass.config.path(backup_file))
+        if not backup_path.startswith(config_dir + os.sep):
+            raise HomeAssistantError(
+                f"Backup file must be inside the config directory: {backup_file}"
+            )
+        return backup_path
+
+    async def async_restore_entities(self, backup_file: str) -> Dict[str, Any]:
+        """Re-register entities from a backup that are missing from the registry."""
+        backup_path = self._resolve_backup_path(backup_file)
+        if not await self.hass.async_add_executor_job(os.path.isfile, backup_path):
+            raise HomeAssistantError(f"Backup file not found: {backup_file}")
+
+        _LOGGER.info(f"Starting restore from {backup_file}")
+        entity_registry = async_get_entity_registry(self.hass)
+        device_registry = async_get_device_registry(self.hass)
+
+        # Index what is already registered so each record is a set lookup
+        registered = {
+            (entry.domain, entry.platform, entry.unique_id)
+            for entry in entity_registry.entities.values()
+        }
+        restored = skipped = conflicting = 0
+
+        records = iter_backup_records(backup_path)
+        try:
+            while batch := await self.hass.async_add_executor_job(
+                read_batch, records, RESTORE_BATCH_SIZE
+            ):
+                for record in batch:
+                    entity_id = record.get("entity_id")
+                    platform = record.get("platform")
+                    unique_id = record.get("unique_id")
+                    if (
+                        not isinstance(entity_id, str)
+                        or not valid_entity_id(entity_id)
+                        or not platform
+                        or unique_id is None
+                    ):
+                        skipped += 1
+                        continue
+
+                    domain, object_id = entity_id.split(".", 1)
+                    key = (domain, platform, unique_id)
+                    if key in registered:
+                        skipped += 1
+                        continue
+                    if entity_id in entity_registry.entities:
+                        # The entity id now belongs to another registration
+                        conflicting += 1
+                        continue
+
+                    config_entry = None
+                    if config_entry_id := record.get("config_entry_id"):
+                        config_entry = self.hass.config_entries.async_get_entry(
+                            config_entry_id
+                        )
+                    device_id = record.get("device_id")
+                    if device_id and device_id not in device_registry.devices:
+                        device_id = None
+
+                    try:
+                        entity_registry.async_get_or_create(
+                            domain,
+                            platform,
+                            unique_id,
+                            suggested_object_id=object_id,
+                            config_entry=config_entry,
+                            device_id=device_id,
+                            original_name=record.get("name"),
+                        )
+                    except Exception as ex:
+                        _LOGGER.error(f"Error restoring entity {entity_id}: {ex}")
+                        skipped += 1
+                        continue
+
+                    registered.add(key)
+                    restored += 1
+
+                _LOGGER.debug(
+                    f"Restore progress: {restored} restored, {skipped} skipped, "
+                    f"{conflicting} conflicting"
+                )
+                # Let the event loop breathe between batches
+                await asyncio.sleep(0)
+        finally:
+            await self.hass.async_add_executor_job(records.close)
+
+        result = {
+            "backup_file": backup_file,
+            "restored_count": restored,
+            "skipped_count": skipped,
+            "conflicting_count": conflicting,
+        }
+        _LOGGER.info(f"Restore completed: {result}")
+        self.hass.bus.async_fire(EVENT_RESTORE_COMPLETE, result)
+        return result
+
+    def query_obsolete(
+        self,
+        entity_ids: Optional[List[str]] = None,
+        **filters: Optional[List[Any]],
+    ) -> List[ObsoleteEntity]:
+        """Return obsolete entities matching all given filters."""
+        return self._obsolete_entities.query(entity_ids, **filters)
+
+    @callback
+    def async_reset_results(self) -> None:
+        """Forget the current scan results."""
+        removed = sorted(self._obsolete_entities.keys())
+        self._obsolete_entities.clear()
+        self._last_scan = None
+        if removed:
+            self._generation += 1
+            self._async_publish_delta(
+                ScanDelta(self._generation, "reset", [], removed, 0)
+            )
+        self._schedule_results_save()
+        self.async_set_updated_data(self._build_data())
+
+    def _get_page_snapshot(
+        self, generation: int, sort: str, descending: bool
+    ) -> Tuple[ObsoleteEntity, ...]:
+        """Return the sorted results of a generation, building them once."""
+        key = (generation, sort, descending)
+        if (snapshot := self._page_snapshots.get(key)) is not None:
+            self._page_snapshots.move_to_end(key)
+            return snapshot
+        if generation != self._generation:
+            raise ServiceValidationError(
+                "Cursor refers to results that are no longer available; "
+                "start again without a cursor"
+            )
+
+        def sort_key(entity: ObsoleteEntity) -> Tuple[bool, Any, str]:
+            value = getattr(entity, sort)
+            return (value is None, value or "", entity.entity_id)
+
+        snapshot = tuple(
+            sorted(self._obsolete_entities.values(), key=sort_key, reverse=descending)
+        )
+        self._page_snapshots[key] = snapshot
+        while len(self._page_snapshots) > PAGE_SNAPSHOT_LIMIT:
+            self._page_snapshots.popitem(last=False)
+        return snapshot
+
+    def get_obsolete_page(
+        self,
+        page_size: int,
+        sort: str = "entity_id",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Return one page of obsolete entities and a cursor for the next."""
+        generation = self._generation
+        offset = 0
+        if cursor:
+            try:
+                gen, sort, order, start = cursor.split(".")
+                generation, offset = int(gen), int(start)
+                descending = order == "desc"
+            except ValueError as ex:
+                raise ServiceValidationError(f"Invalid cursor: {cursor}") from ex
+            if sort not in PAGE_SORT_KEYS:
+                raise ServiceValidationError(f"Invalid cursor: {cursor}")
+
+        snapshot = self._get_page_snapshot(generation, sort, descending)
+        if not 0 <= offset <= len(snapshot):
+            raise ServiceValidationError(f"Invalid cursor: {cursor}")
+        end = offset + page_size
+        next_cursor = None
+        if end < len(snapshot):
+            next_cursor = f"{generation}.{sort}.{'desc' if descending else 'asc'}.{end}"
+
+        return {
+            "generation": generation,
+            "total": len(snapshot),
+            "entities": [entity.as_dict() for entity in snapshot[offset:end]],
+            "next_cursor": next_cursor,
+        }
+
+    def obsolete_entity_ids(self, limit: Optional[int] = None) -> List[str]:
+        """Return obsolete entity ids, optionally only the first few."""
+        return list(islice(self._obsolete_entities.keys(), limit))
+
+    @property
+    def generation(self) -> int:
+        """Return the generation of the current results."""
+        return self._generation
+
     @property
-    def obsolete_entities(self) -> List[Dict[str, Any]]:
+    def obsolete_entities(self) -> List[ObsoleteEntity]:
         """Return list of obsolete entities."""
-        return self._obsolete_entities
+        return list(self._obsolete_entities.values())
+
+    def get_scan_deltas(self, since_generation: int = 0) -> List[ScanDelta]:
+        """Return the kept deltas newer than a results generation, oldest first."""
+        return [
+            delta for delta in self._deltas if delta.generation > since_generation
+        ]
+
+    @property
+    def orphaned_devices(self) -> List[OrphanedDevice]:
+        """Return the orphaned devices of the last device scan."""
+        return list(self._orphaned_devices.values())
+
+    @property
+    def rule_pipeline(self) -> RulePipeline:
+        """Return the rules used by scans in evaluation order."""
+        return self._get_rule_pipeline()
+
+    @property
+    def operation_stats(self) -> Dict[str, OperationStats]:
+        """Return the stats of the last scan and cleanup."""
+        return self._operation_stats
+
+    @property
+    def scan_progress(self) -> Optional[Dict[str, Any]]:
+        """Return progress of the running scan, if any."""
+        return self._scan_progress
 
     @property
     def last_scan(self) -> Optional[datetime]:
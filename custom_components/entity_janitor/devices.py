@@ -0,0 +1,80 @@
+"""Orphaned device detection for Entity Janitor."""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set
+
+from .exclusions import ExclusionMatcher
+from .models import OrphanedDevice
+
+
+class DeviceScan:
+    """Find orphaned devices through a device to entities index.
+
+    The index is built in one pass over the entity registry, so judging a
+    device costs a dict lookup instead of a registry query. Both passes
+    take their input in chunks so the caller can yield in between.
+    """
+
+    def __init__(
+        self,
+        config_entry_ids: Set[str],
+        cutoff_date: datetime,
+        exclusions: ExclusionMatcher,
+    ) -> None:
+        """Snapshot the options for one scan."""
+        self.config_entry_ids = config_entry_ids
+        self.cutoff_date = cutoff_date
+        self.exclusions = exclusions
+        self.entities_by_device: Dict[str, List[Any]] = {}
+        self.orphaned: Dict[str, OrphanedDevice] = {}
+
+    def index_entities(self, entities: Iterable[Any]) -> None:
+        """Add registry entries to the device to entities index."""
+        index = self.entities_by_device
+        for entity in entities:
+            device_id = entity.device_id
+            if device_id is None:
+                continue
+            device_entities = index.get(device_id)
+            if device_entities is None:
+                index[device_id] = [entity]
+            else:
+                device_entities.append(entity)
+
+    def judge_devices(self, devices: Iterable[Any], parents: Set[str]) -> None:
+        """Record which of the devices are orphaned.
+
+        A device is orphaned when none of its config entries exist anymore,
+        or when no entity is left on it. Devices in parents (other devices
+        connect through them), devices younger than the cutoff and devices
+        with an excluded entity are never reported.
+        """
+        entities_by_device = self.entities_by_device
+        config_entry_ids = self.config_entry_ids
+        for device in devices:
+            device_id = device.id
+            entities = entities_by_device.get(device_id)
+            if config_entry_ids.isdisjoint(device.config_entries):
+                reason = "No config entries"
+            elif entities is None:
+                reason = "No entities"
+            else:
+                continue
+
+            if device_id in parents:
+                continue
+            created_at = getattr(device, "created_at", None)
+            if created_at is not None and created_at > self.cutoff_date:
+                continue
+            if entities and any(map(self.exclusions.matches_entry, entities)):
+                continue
+
+            self.orphaned[device_id] = OrphanedDevice(
+                device_id,
+                device.name_by_user or device.name,
+                device.manufacturer,
+                device.model,
+                sorted(device.config_entries),
+                [entity.entity_id for entity in entities or ()],
+                created_at,
+                reason,
+            )
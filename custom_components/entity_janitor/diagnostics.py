@@ -0,0 +1,36 @@
+"""Diagnostics support for Entity Janitor."""
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import EntityJanitorCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: EntityJanitorCoordinator = hass.data[DOMAIN][entry.entry_id]
+    last_scan = coordinator.last_scan
+    last_device_scan = coordinator.data.get("last_device_scan")
+
+    return {
+        "options": dict(entry.options),
+        "data": {
+            **coordinator.data,
+            "last_scan": last_scan.isoformat() if last_scan else None,
+            "last_device_scan": (
+                last_device_scan.isoformat() if last_device_scan else None
+            ),
+        },
+        "scan_progress": coordinator.scan_progress,
+        "schedule": coordinator.schedule,
+        "scan_deltas": [delta.as_dict(0) for delta in coordinator.get_scan_deltas()],
+        "rules": coordinator.rule_pipeline.describe(),
+        "operation_stats": {
+            operation: stats.as_dict()
+            for operation, stats in coordinator.operation_stats.items()
+        },
+    }
@@ -0,0 +1,96 @@
+"""Exclusion matching for Entity Janitor."""
+import re
+from fnmatch import translate
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+GLOB_CHARACTERS = frozenset("*?[")
+
+
+def _compile_globs(globs: List[str]) -> Optional[Callable[[str], Any]]:
+    """Combine globs into one anchored pattern and return its match method."""
+    if not globs:
+        return None
+    return re.compile("|".join(translate(glob) for glob in globs)).match
+
+
+class ExclusionMatcher:
+    """Exclusion options compiled once and checked per entity.
+
+    Exact entity ids, domains, platforms and config entry ids are hashed
+    sets. Entity id globs are combined into one pattern per literal
+    domain, so an entity is only matched against the globs of its own
+    domain; globs with a wildcard domain share one pattern tried for all.
+    """
+
+    __slots__ = (
+        "domains",
+        "entity_ids",
+        "platforms",
+        "config_entry_ids",
+        "_domain_globs",
+        "_any_domain_glob",
+    )
+
+    def __init__(
+        self,
+        domains: Iterable[str] = (),
+        entities: Iterable[str] = (),
+        platforms: Iterable[str] = (),
+        config_entry_ids: Iterable[str] = (),
+    ) -> None:
+        """Compile the exclusions; entities may be exact ids or globs."""
+        self.domains = frozenset(domains)
+        self.platforms = frozenset(platforms)
+        self.config_entry_ids = frozenset(config_entry_ids)
+
+        entity_ids = set()
+        globs_by_domain: Dict[str, List[str]] = {}
+        any_domain_globs: List[str] = []
+        for entity in entities:
+            if GLOB_CHARACTERS.isdisjoint(entity):
+                entity_ids.add(entity)
+                continue
+            domain, dot, _ = entity.partition(".")
+            if dot and GLOB_CHARACTERS.isdisjoint(domain):
+                globs_by_domain.setdefault(domain, []).append(entity)
+            else:
+                any_domain_globs.append(entity)
+
+        self.entity_ids = frozenset(entity_ids)
+        self._domain_globs = {
+            domain: _compile_globs(globs) for domain, globs in globs_by_domain.items()
+        }
+        self._any_domain_glob = _compile_globs(any_domain_globs)
+
+    def matches(
+        self,
+        entity_id: str,
+        domain: str,
+        platform: Optional[str],
+        config_entry_id: Optional[str],
+    ) -> bool:
+        """Return whether an entity is excluded."""
+        if (
+            domain in self.domains
+            or entity_id in self.entity_ids
+            or platform in self.platforms
+            or config_entry_id in self.config_entry_ids
+        ):
+            return True
+        domain_glob = self._domain_globs.get(domain)
+        if domain_glob is not None and domain_glob(entity_id):
+            return True
+        return (
+            self._any_domain_glob is not None
+            and self._any_domain_glob(entity_id) is not None
+        )
+
+    def matches_entry(self, entity: Any) -> bool:
+        """Return whether an entity registry entry is excluded."""
+        entity_id = entity.entity_id
+        return self.matches(
+            entity_id,
+            entity_id.split(".", 1)[0],
+            entity.platform,
+            entity.config_entry_id,
+        )
@@ -0,0 +1,168 @@
+"""File helpers for Entity Janitor backups and reports."""
+import gzip
+import json
+import logging
+import os
+import tempfile
+from contextlib import suppress
+from itertools import islice
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+FILE_MODE = 0o644
+NDJSON_FORMAT = "entity_janitor_ndjson/1"
+STORE_FORMAT = "entity_janitor_store/1"
+STORE_PACK_DIR = "packs"
+
+
+def write_atomic(path: str, write: Callable[[IO[bytes]], None]) -> None:
+    """Write a file through a temp file and rename it into place.
+
+    Must run in the executor. A crash mid-write leaves at most a stray
+    temp file behind, never a truncated target.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".",
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize records that know how to turn themselves into dicts."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Serialize data as JSON and write it atomically."""
+
+    def _write(file: IO[bytes]) -> None:
+        file.write(
+            json.dumps(
+                data, indent=indent, ensure_ascii=False, default=_json_default
+            ).encode("utf-8")
+        )
+
+    write_atomic(path, _write)
+
+
+async def async_write_json(
+    hass: HomeAssistant, path: str, data: Any, indent: int = 2
+) -> None:
+    """Write a JSON file from the executor."""
+    await hass.async_add_executor_job(write_json, path, data, indent)
+
+
+def write_ndjson_gz(path: str, header: Dict[str, Any], records: Iterable[Any]) -> None:
+    """Stream a header line and one JSON record per line into a gzip file."""
+
+    def _write(file: IO[bytes]) -> None:
+        with gzip.GzipFile(fileobj=file, mode="wb") as gz_file:
+            gz_file.write(_dump_line({**header, "format": NDJSON_FORMAT}))
+            for record in records:
+                gz_file.write(_dump_line(record))
+
+    write_atomic(path, _write)
+
+
+async def async_write_ndjson_gz(
+    hass: HomeAssistant,
+    path: str,
+    header: Dict[str, Any],
+    records: Iterable[Any],
+) -> None:
+    """Write a gzip NDJSON file from the executor."""
+    await hass.async_add_executor_job(write_ndjson_gz, path, header, records)
+
+
+def _dump_line(data: Any) -> bytes:
+    """Encode one NDJSON line."""
+    return (
+        json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        )
+        + "\n"
+    ).encode("utf-8")
+
+
+def encode_record(record: Any) -> str:
+    """Encode a record as compact JSON with sorted keys.
+
+    Equal records always encode to the same string, so the encoding can
+    be hashed to deduplicate them.
+    """
+    return json.dumps(
+        record,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+        default=_json_default,
+    )
+
+
+def iter_backup_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the entity records of a backup file.
+
+    Gzip NDJSON backups are read one line at a time. Plain JSON backups
+    are a single document and have to be loaded whole. Backup store
+    manifests are followed into the packs holding their records.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            file.readline()  # header
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if data.get("format") == STORE_FORMAT:
+        pack_dir = os.path.join(os.path.dirname(path), STORE_PACK_DIR)
+        for pack, hashes in data["packs"].items():
+            yield from iter_pack_records(os.path.join(pack_dir, pack), hashes)
+        return
+    yield from data.get("entities", [])
+
+
+def iter_pack_records(path: str, hashes: Collection[str]) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a backup store pack whose hash is in hashes."""
+    wanted = set(hashes)
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["hash"] in wanted:
+                yield entry["record"]
+
+
+def read_batch(records: Iterator[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """Pull up to size records from an iterator; run in the executor."""
+    return list(islice(records, size))
@@ -0,0 +1,69 @@
+"""Recorder queries for Entity Janitor."""
+import logging
+from typing import Dict, Optional
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _last_state_changes(hass: HomeAssistant) -> Dict[str, float]:
+    """Return the last state change timestamp of every recorded entity.
+
+    One grouped query over the states table; runs in the recorder's
+    executor. Rows store no last_changed_ts when the state itself changed,
+    in which case last_updated_ts is when it changed.
+    """
+    # The recorder and its dependencies are only needed by the stale rule
+    from sqlalchemy import func, select
+
+    from homeassistant.components.recorder.db_schema import States, StatesMeta
+    from homeassistant.components.recorder.util import session_scope
+
+    last_changed = (
+        select(
+            States.metadata_id,
+            func.max(
+                func.coalesce(States.last_changed_ts, States.last_updated_ts)
+            ).label("last_changed_ts"),
+        )
+        .group_by(States.metadata_id)
+        .subquery()
+    )
+    query = select(StatesMeta.entity_id, last_changed.c.last_changed_ts).join(
+        last_changed, StatesMeta.metadata_id == last_changed.c.metadata_id
+    )
+    with session_scope(hass=hass, read_only=True) as session:
+        return {
+            entity_id: timestamp
+            for entity_id, timestamp in session.execute(query)
+            if timestamp is not None
+        }
+
+
+async def async_last_state_changes(
+    hass: HomeAssistant, stale_days: int
+) -> Optional[Dict[str, float]]:
+    """Query the recorder for when each entity last changed state.
+
+    Returns None if the recorder is not available or the query fails.
+    """
+    if "recorder" not in hass.config.components:
+        _LOGGER.warning("The stale rule needs the recorder integration")
+        return None
+
+    from homeassistant.components.recorder import get_instance
+
+    instance = get_instance(hass)
+    if instance.keep_days < stale_days:
+        _LOGGER.warning(
+            f"The recorder keeps {instance.keep_days} days of history, fewer "
+            f"than the {stale_days} stale days, so no entity can be found "
+            "stale; raise purge_keep_days or lower stale_days"
+        )
+
+    try:
+        return await instance.async_add_executor_job(_last_state_changes, hass)
+    except Exception as ex:
+        _LOGGER.error(f"Error querying last state changes: {ex}")
+        return None
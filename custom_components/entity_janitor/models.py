@@ -0,0 +1,359 @@
+"""Data models for Entity Janitor."""
+from datetime import datetime
+from sys import intern
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    Iterable,
+    KeysView,
+    List,
+    Optional,
+    Set,
+    ValuesView,
+)
+
+from homeassistant.util import dt as dt_util
+
+
+class ObsoleteEntity:
+    """An entity flagged as obsolete by a scan.
+
+    Uses __slots__ and interned domain, platform and reason strings so tens
+    of thousands of results stay compact. Convert with as_dict() only when
+    serializing.
+    """
+
+    __slots__ = (
+        "entity_id",
+        "domain",
+        "platform",
+        "device_id",
+        "config_entry_id",
+        "created_at",
+        "reason",
+        "name",
+        "unique_id",
+    )
+
+    def __init__(
+        self,
+        entity_id: str,
+        domain: str,
+        platform: str,
+        device_id: Optional[str],
+        config_entry_id: Optional[str],
+        created_at: Optional[datetime],
+        reason: str,
+        name: Optional[str],
+        unique_id: str,
+    ) -> None:
+        """Initialize the record."""
+        self.entity_id = entity_id
+        self.domain = intern(domain)
+        self.platform = intern(platform)
+        self.device_id = device_id
+        self.config_entry_id = config_entry_id
+        self.created_at = created_at
+        self.reason = intern(reason)
+        self.name = name
+        self.unique_id = unique_id
+
+    def _values(self) -> tuple:
+        """Return the slot values in declaration order."""
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two records field by field."""
+        if not isinstance(other, ObsoleteEntity):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __repr__(self) -> str:
+        """Return a short representation for logs."""
+        return f"<ObsoleteEntity {self.entity_id} reason={self.reason!r}>"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record as a JSON-serializable dict."""
+        return {
+            "entity_id": self.entity_id,
+            "domain": self.domain,
+            "platform": self.platform,
+            "device_id": self.device_id,
+            "config_entry_id": self.config_entry_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "reason": self.reason,
+            "name": self.name,
+            "unique_id": self.unique_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ObsoleteEntity":
+        """Build a record from its dict form."""
+        created_at = data.get("created_at")
+        return cls(
+            data["entity_id"],
+            data.get("domain") or data["entity_id"].split(".")[0],
+            data.get("platform") or "",
+            data.get("device_id"),
+            data.get("config_entry_id"),
+            dt_util.parse_datetime(created_at) if created_at else None,
+            data.get("reason") or "",
+            data.get("name"),
+            data.get("unique_id"),
+        )
+
+
+class ObsoleteIndex:
+    """Obsolete records keyed by entity id with secondary indexes.
+
+    Lookups by domain, platform, reason, device or config entry cost time
+    proportional to the result, not to the number of obsolete entities.
+    """
+
+    INDEXED_FIELDS = ("domain", "platform", "reason", "device_id", "config_entry_id")
+
+    def __init__(self, records: Iterable[ObsoleteEntity] = ()) -> None:
+        """Initialize the index."""
+        self._records: Dict[str, ObsoleteEntity] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {
+            field: {} for field in self.INDEXED_FIELDS
+        }
+        for record in records:
+            self[record.entity_id] = record
+
+    def __len__(self) -> int:
+        """Return the number of obsolete entities."""
+        return len(self._records)
+
+    def __contains__(self, entity_id: object) -> bool:
+        """Return whether an entity is obsolete."""
+        return entity_id in self._records
+
+    def __getitem__(self, entity_id: str) -> ObsoleteEntity:
+        """Return the record of an obsolete entity."""
+        return self._records[entity_id]
+
+    def __setitem__(self, entity_id: str, record: ObsoleteEntity) -> None:
+        """Add or replace a record and update the indexes."""
+        self.pop(entity_id, None)
+        self._records[entity_id] = record
+        for field, index in self._indexes.items():
+            value = getattr(record, field)
+            if value is not None:
+                index.setdefault(value, set()).add(entity_id)
+
+    def get(
+        self, entity_id: str, default: Optional[ObsoleteEntity] = None
+    ) -> Optional[ObsoleteEntity]:
+        """Return the record of an entity, or default."""
+        return self._records.get(entity_id, default)
+
+    def pop(
+        self, entity_id: str, default: Optional[ObsoleteEntity] = None
+    ) -> Optional[ObsoleteEntity]:
+        """Remove a record and drop it from the indexes."""
+        record = self._records.pop(entity_id, None)
+        if record is None:
+            return default
+        for field, index in self._indexes.items():
+            value = getattr(record, field)
+            if value is None:
+                continue
+            entity_ids = index[value]
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del index[value]
+        return record
+
+    def clear(self) -> None:
+        """Drop all records."""
+        self._records.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+    def values(self) -> ValuesView[ObsoleteEntity]:
+        """Return all records."""
+        return self._records.values()
+
+    def keys(self) -> KeysView[str]:
+        """Return all obsolete entity ids."""
+        return self._records.keys()
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Return the number of records per value of an indexed field."""
+        return {value: len(ids) for value, ids in self._indexes[field].items()}
+
+    def query(
+        self,
+        entity_ids: Optional[Iterable[str]] = None,
+        **filters: Optional[Iterable[Any]],
+    ) -> List[ObsoleteEntity]:
+        """Return records matching every given filter, sorted by entity id.
+
+        Each filter is a collection of accepted values for an indexed field.
+        """
+        candidates: List[Set[str]] = []
+        if entity_ids is not None:
+            candidates.append({eid for eid in entity_ids if eid in self._records})
+
+        for field, values in filters.items():
+            if values is None:
+                continue
+            index = self._indexes[field]
+            matches: Set[str] = set()
+            for value in values:
+                matches.update(index.get(value, ()))
+            candidates.append(matches)
+
+        if not candidates:
+            return sorted(self._records.values(), key=_entity_id_key)
+
+        # Intersect starting from the smallest set
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for matches in candidates[1:]:
+            if not result:
+                break
+            result.intersection_update(matches)
+
+        return [self._records[entity_id] for entity_id in sorted(result)]
+
+
+def _entity_id_key(record: ObsoleteEntity) -> str:
+    """Sort key for records."""
+    return record.entity_id
+
+
+class OrphanedDevice:
+    """A device flagged as orphaned by a device scan.
+
+    Keeps the ids of the entities still attached to the device, since the
+    entity registry removes them together with the device.
+    """
+
+    __slots__ = (
+        "device_id",
+        "name",
+        "manufacturer",
+        "model",
+        "config_entry_ids",
+        "entity_ids",
+        "created_at",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        device_id: str,
+        name: Optional[str],
+        manufacturer: Optional[str],
+        model: Optional[str],
+        config_entry_ids: List[str],
+        entity_ids: List[str],
+        created_at: Optional[datetime],
+        reason: str,
+    ) -> None:
+        """Initialize the record."""
+        self.device_id = device_id
+        self.name = name
+        self.manufacturer = manufacturer
+        self.model = model
+        self.config_entry_ids = config_entry_ids
+        self.entity_ids = entity_ids
+        self.created_at = created_at
+        self.reason = intern(reason)
+
+    def __repr__(self) -> str:
+        """Return a short representation for logs."""
+        return f"<OrphanedDevice {self.device_id} reason={self.reason!r}>"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record as a JSON-serializable dict."""
+        return {
+            "device_id": self.device_id,
+            "name": self.name,
+            "manufacturer": self.manufacturer,
+            "model": self.model,
+            "config_entry_ids": self.config_entry_ids,
+            "entity_ids": self.entity_ids,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "reason": self.reason,
+        }
+
+
+class ScanDelta:
+    """What changed in the obsolete results between two passes.
+
+    Only the added and removed ids are kept; entities obsolete before and
+    after are counted, since listing them would cost as much as the
+    results themselves.
+    """
+
+    __slots__ = ("generation", "source", "created_at", "added", "removed", "unchanged")
+
+    def __init__(
+        self,
+        generation: int,
+        source: str,
+        added: List[str],
+        removed: List[str],
+        unchanged: int,
+    ) -> None:
+        """Initialize the delta; added and removed are sorted."""
+        self.generation = generation
+        self.source = source
+        self.created_at = dt_util.utcnow()
+        self.added = added
+        self.removed = removed
+        self.unchanged = unchanged
+
+    @classmethod
+    def between(
+        cls,
+        generation: int,
+        source: str,
+        previous: AbstractSet[str],
+        current: AbstractSet[str],
+    ) -> "ScanDelta":
+        """Compare two sets of obsolete ids, such as ObsoleteIndex.keys()."""
+        added = current - previous
+        return cls(
+            generation,
+            source,
+            sorted(added),
+            sorted(previous - current),
+            len(current) - len(added),
+        )
+
+    def __bool__(self) -> bool:
+        """Return whether anything changed."""
+        return bool(self.added or self.removed)
+
+    def __repr__(self) -> str:
+        """Return a short representation for logs."""
+        return (
+            f"<ScanDelta {self.generation} +{len(self.added)} "
+            f"-{len(self.removed)} ={self.unchanged}>"
+        )
+
+    def as_dict(self, max_ids: Optional[int] = None) -> Dict[str, Any]:
+        """Return the delta as a JSON-serializable dict.
+
+        With max_ids, at most that many added and removed ids are listed
+        and truncated tells whether some were left out.
+        """
+        added = self.added if max_ids is None else self.added[:max_ids]
+        removed = self.removed if max_ids is None else self.removed[:max_ids]
+        return {
+            "generation": self.generation,
+            "source": self.source,
+            "created_at": self.created_at.isoformat(),
+            "added": added,
+            "removed": removed,
+            "added_count": len(self.added),
+            "removed_count": len(self.removed),
+            "unchanged_count": self.unchanged,
+            "truncated": len(added) + len(removed)
+            < len(self.added) + len(self.removed),
+        }
@@ -0,0 +1,469 @@
+"""Obsolescence rules for Entity Janitor scans."""
+import time
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+
+from .exclusions import ExclusionMatcher
+from .stats import OperationStats
+
+RULE_DETECTOR = "detector"
+RULE_GUARD = "guard"
+
+
+class ScanContext:
+    """Registry snapshot shared by every entity check in one pass."""
+
+    def __init__(
+        self,
+        device_registry: Any,
+        states: Any,
+        entry_states: Dict[str, ConfigEntryState],
+        cutoff_date: datetime,
+        exclusions: ExclusionMatcher,
+        evaluate: Callable[[str, Any, "ScanContext"], str],
+        last_changed: Optional[Dict[str, float]] = None,
+        stale_days: int = 0,
+    ) -> None:
+        """Initialize the scan context."""
+        self.device_registry = device_registry
+        self.states = states
+        self.entry_states = entry_states
+        self.loaded_entry_ids = {
+            entry_id
+            for entry_id, entry_state in entry_states.items()
+            if entry_state is ConfigEntryState.LOADED
+        }
+        self.cutoff_date = cutoff_date
+        self.exclusions = exclusions
+        # Entities sharing a device are only judged once
+        self.device_verdicts: Dict[str, str] = {}
+        # Compiled rule chain returning the reason an entity is obsolete
+        self.evaluate = evaluate
+        # Last state change per entity from the recorder, if it was queried
+        self.last_changed = last_changed
+        self.stale_cutoff = time.time() - stale_days * 86400
+        self.stale_reason = f"No state change for {stale_days} days"
+
+
+# Called with (entity_id, domain, registry entry, context). Detectors return
+# the reason an entity is obsolete or "", guards return True to keep it.
+RuleCheck = Callable[[str, str, Any, ScanContext], Any]
+
+
+class Rule:
+    """A check applied to every entity during a scan.
+
+    An entity is obsolete when a detector gives a reason and no guard
+    keeps it. Cost is a rough relative price of one call, used together
+    with measured hit rates to order the checks.
+    """
+
+    __slots__ = ("key", "kind", "cost", "check", "default_enabled", "exempt_guards")
+
+    def __init__(
+        self,
+        key: str,
+        kind: str,
+        cost: float,
+        check: RuleCheck,
+        default_enabled: bool = True,
+        exempt_guards: FrozenSet[str] = frozenset(),
+    ) -> None:
+        """Initialize the rule.
+
+        exempt_guards names guards that do not apply to entities this
+        detector flags.
+        """
+        self.key = key
+        self.kind = kind
+        self.cost = cost
+        self.check = check
+        self.default_enabled = default_enabled
+        self.exempt_guards = exempt_guards
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(rule: Rule) -> Rule:
+    """Make a rule available to scans."""
+    RULES[rule.key] = rule
+    return rule
+
+
+def judge_device(device: Any, loaded_entry_ids: Set[str]) -> str:
+    """Return the reason a device makes its entities obsolete, or ""."""
+    if not device:
+        return "Device not found"
+    if not device.config_entries:
+        return "Device has no config entries"
+    if loaded_entry_ids.isdisjoint(device.config_entries):
+        return "Device config entries not loaded"
+    return ""
+
+
+def _device_reason(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> str:
+    """Flag entities whose device is gone or has no loaded config entry."""
+    if not entity.device_id:
+        return ""
+    reason = context.device_verdicts.get(entity.device_id)
+    if reason is None:
+        reason = judge_device(
+            context.device_registry.devices.get(entity.device_id),
+            context.loaded_entry_ids,
+        )
+        context.device_verdicts[entity.device_id] = reason
+    return reason
+
+
+def _config_entry_reason(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> str:
+    """Flag device-less entities whose config entry is gone or not loaded."""
+    if entity.device_id or not entity.config_entry_id:
+        return ""
+    entry_state = context.entry_states.get(entity.config_entry_id)
+    if entry_state is None:
+        return "Config entry not found"
+    if entry_state is not ConfigEntryState.LOADED:
+        return f"Config entry state: {entry_state.value}"
+    return ""
+
+
+def _disabled_reason(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> str:
+    """Flag entities that have been disabled."""
+    if entity.disabled_by is None:
+        return ""
+    return f"Disabled by {entity.disabled_by.value}"
+
+
+def _stale_reason(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> str:
+    """Flag entities whose state has not changed for the stale period."""
+    if context.last_changed is None:
+        return ""
+    last_changed = context.last_changed.get(entity_id)
+    if last_changed is None or last_changed > context.stale_cutoff:
+        return ""
+    return context.stale_reason
+
+
+def _is_excluded(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> bool:
+    """Keep entities matching an exclusion."""
+    return context.exclusions.matches(
+        entity_id, domain, entity.platform, entity.config_entry_id
+    )
+
+
+def _is_too_new(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> bool:
+    """Keep entities younger than the minimum age.
+
+    Registry entries only record created_at since Home Assistant 2024.5.
+    """
+    created_at = getattr(entity, "created_at", None)
+    return created_at is not None and created_at > context.cutoff_date
+
+
+def _has_state(
+    entity_id: str, domain: str, entity: Any, context: ScanContext
+) -> bool:
+    """Keep entities that currently have a state."""
+    return context.states.get(entity_id) is not None
+
+
+register_rule(Rule("device", RULE_DETECTOR, 2, _device_reason))
+register_rule(Rule("config_entry", RULE_DETECTOR, 1, _config_entry_reason))
+register_rule(Rule("disabled", RULE_DETECTOR, 1, _disabled_reason, False))
+# Stale entities usually still have a state
+register_rule(
+    Rule("stale", RULE_DETECTOR, 1, _stale_reason, False, frozenset({"has_state"}))
+)
+register_rule(Rule("excluded", RULE_GUARD, 1, _is_excluded))
+register_rule(Rule("too_new", RULE_GUARD, 1, _is_too_new))
+register_rule(Rule("has_state", RULE_GUARD, 3, _has_state))
+
+
+def select_rules(enabled: Iterable[str], disabled: Iterable[str]) -> List[Rule]:
+    """Return the rules to use given the rules turned on and off in options.
+
+    Guards protect entities from removal and cannot be disabled.
+    """
+    enabled = set(enabled)
+    disabled = set(disabled)
+    return [
+        rule
+        for key, rule in RULES.items()
+        if rule.kind == RULE_GUARD
+        or key in enabled
+        or (rule.default_enabled and key not in disabled)
+    ]
+
+
+# Evaluates one entity and returns its reason, or "" if it is not obsolete
+Evaluator = Callable[[str, Any, ScanContext], str]
+
+class RulePipeline:
+    """Rules compiled into a short-circuiting chain, cheapest and most decisive first.
+
+    Detectors run back to back as one step of the chain; the first reason
+    found wins. That step and the guards are each a filter that can rule
+    an entity out, ordered by cost per entity ruled out among the entities
+    still left. Rates come from measure(), which runs every rule on a
+    sample without short-circuiting; until then declared costs decide.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """Initialize the pipeline."""
+        self.rules = rules
+        # Share of sampled entities each rule hit, "detectors" for any detector
+        self.rates: Dict[str, float] = dict(rates or {})
+        self._detectors: List[Rule] = []
+        # Guards in order; None is where the detectors run
+        self._steps: List[Optional[Rule]] = []
+        self._evaluator: Optional[Evaluator] = None
+        self._order()
+
+    def _rate(self, key: str, default: float) -> float:
+        """Return a rate kept away from 0 so every rank stays finite."""
+        return max(self.rates.get(key, default), 0.001)
+
+    def _order(self, outcomes: Optional[List[Tuple[bool, Set[str]]]] = None) -> None:
+        """Order the rules and drop the compiled chain.
+
+        outcomes holds, per sampled entity, whether any detector hit and
+        which guards would keep it. With them each step is picked by its
+        drop rate among the entities earlier steps let through, which
+        accounts for rules that tend to hit the same entities.
+        """
+        self._detectors = sorted(
+            (rule for rule in self.rules if rule.kind == RULE_DETECTOR),
+            key=lambda rule: rule.cost / self._rate(rule.key, 0.5),
+        )
+        detector_cost = sum(rule.cost for rule in self._detectors)
+        # Guards some detector is exempt from must wait for the detectors
+        pinned = {key for rule in self._detectors for key in rule.exempt_guards}
+        remaining: List[Optional[Rule]] = [None]
+        remaining.extend(rule for rule in self.rules if rule.kind == RULE_GUARD)
+        self._steps = []
+        self._evaluator = None
+
+        def drop_rate(step: Optional[Rule], left: List[Tuple[bool, Set[str]]]) -> float:
+            """Return the share of entities left that a step rules out."""
+            if not left:
+                if step is None:
+                    return 1 - self._rate("detectors", 0.5)
+                return self._rate(step.key, 0.1)
+            if step is None:
+                dropped = sum(not detected for detected, _ in left)
+            else:
+                dropped = sum(step.key in kept for _, kept in left)
+            return dropped / len(left)
+
+        left = list(outcomes or ())
+        while remaining:
+            step = min(
+                (
+                    step
+                    for step in remaining
+                    if step is None or step.key not in pinned or None not in remaining
+                ),
+                key=lambda step: (
+                    (detector_cost if step is None else step.cost)
+                    / max(drop_rate(step, left), 0.001)
+                ),
+            )
+            remaining.remove(step)
+            self._steps.append(step)
+            if step is None:
+                left = [outcome for outcome in left if outcome[0]]
+            else:
+                left = [outcome for outcome in left if step.key not in outcome[1]]
+
+    def has_rule(self, key: str) -> bool:
+        """Return whether a rule is part of the pipeline."""
+        return any(rule.key == key for rule in self.rules)
+
+    @property
+    def order(self) -> List[str]:
+        """Return the rule keys in evaluation order."""
+        keys: List[str] = []
+        for rule in self._steps:
+            if rule is None:
+                keys.extend(detector.key for detector in self._detectors)
+            else:
+                keys.append(rule.key)
+        return keys
+
+    def evaluator(self, stats: Optional[OperationStats] = None) -> Evaluator:
+        """Return the compiled chain; with stats every rule call is timed."""
+        if stats is None and self._evaluator is not None:
+            return self._evaluator
+
+        def prepare(rule: Rule) -> RuleCheck:
+            """Return the check of a rule, timed and counted if needed."""
+            if stats is None:
+                return rule.check
+            check = rule.check
+            phase = f"rule_{rule.key}"
+            counter = rule.key if rule.kind == RULE_GUARD else None
+
+            def timed(
+                entity_id: str, domain: str, entity: Any, context: ScanContext
+            ) -> Any:
+                """Time one call and count guard vetoes."""
+                started = time.perf_counter()
+                result = check(entity_id, domain, entity, context)
+                stats.add_time_since(phase, started)
+                if counter and result:
+                    stats.count(counter)
+                return result
+
+            return timed
+
+        split = self._steps.index(None)
+        guards_before = tuple(prepare(rule) for rule in self._steps[:split])
+        detectors = tuple(prepare(rule) for rule in self._detectors)
+        guards_after = tuple(prepare(rule) for rule in self._steps[split + 1:])
+
+        if any(rule.exempt_guards for rule in self._detectors):
+            evaluate = self._exempting_evaluator(
+                guards_before,
+                tuple(zip(detectors, (rule.exempt_guards for rule in self._detectors))),
+                tuple(zip(guards_after, (rule.key for rule in self._steps[split + 1:]))),
+            )
+            if stats is None:
+                self._evaluator = evaluate
+            return evaluate
+
+        def evaluate(entity_id: str, entity: Any, context: ScanContext) -> str:
+            """Run the chain until a step decides."""
+            domain = entity_id.split(".")[0]
+            for check in guards_before:
+                if check(entity_id, domain, entity, context):
+                    return ""
+            for check in detectors:
+                reason = check(entity_id, domain, entity, context)
+                if reason:
+                    break
+            else:
+                return ""
+            for check in guards_after:
+                if check(entity_id, domain, entity, context):
+                    return ""
+            return reason
+
+        if stats is None:
+            self._evaluator = evaluate
+        return evaluate
+
+    @staticmethod
+    def _exempting_evaluator(
+        guards_before: Tuple[RuleCheck, ...],
+        detectors: Tuple[Tuple[RuleCheck, FrozenSet[str]], ...],
+        guards_after: Tuple[Tuple[RuleCheck, str], ...],
+    ) -> Evaluator:
+        """Return a chain that skips the guards the matching detector is exempt from.
+
+        When a guard keeps an entity, the remaining detectors exempt from
+        every guard that kept it are still tried, so the verdict does not
+        depend on the detector order. Each guard runs at most once.
+        """
+
+        def evaluate(entity_id: str, entity: Any, context: ScanContext) -> str:
+            """Run the chain until a step decides."""
+            domain = entity_id.split(".")[0]
+            for check in guards_before:
+                if check(entity_id, domain, entity, context):
+                    return ""
+            kept_by: Set[str] = set()
+            passed: Set[str] = set()
+            for check, exempt in detectors:
+                if not kept_by <= exempt:
+                    continue
+                reason = check(entity_id, domain, entity, context)
+                if not reason:
+                    continue
+                for guard, key in guards_after:
+                    if key in exempt or key in passed:
+                        continue
+                    if guard(entity_id, domain, entity, context):
+                        kept_by.add(key)
+                        break
+                    passed.add(key)
+                else:
+                    return reason
+            return ""
+
+        return evaluate
+
+    def measure(
+        self, entities: Iterable[Tuple[str, Any]], context: ScanContext
+    ) -> None:
+        """Record hit rates of every rule on a sample and reorder the chain."""
+        hits = {rule.key: 0 for rule in self.rules}
+        outcomes: List[Tuple[bool, Set[str]]] = []
+        guards = [rule for rule in self.rules if rule.kind == RULE_GUARD]
+        for entity_id, entity in entities:
+            domain = entity_id.split(".")[0]
+            detected = False
+            exempt: Set[str] = set()
+            for rule in self._detectors:
+                if rule.check(entity_id, domain, entity, context):
+                    hits[rule.key] += 1
+                    detected = True
+                    exempt |= rule.exempt_guards
+            kept: Set[str] = set()
+            for rule in guards:
+                if rule.check(entity_id, domain, entity, context):
+                    hits[rule.key] += 1
+                    kept.add(rule.key)
+            # A guard only rules an entity out if no matching detector is exempt
+            outcomes.append((detected, kept - exempt))
+
+        if not outcomes:
+            return
+        self.rates = {key: count / len(outcomes) for key, count in hits.items()}
+        self.rates["detectors"] = (
+            sum(detected for detected, _ in outcomes) / len(outcomes)
+        )
+        self._order(outcomes)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Return the rules in evaluation order with their cost and hit rate."""
+        rules = {rule.key: rule for rule in self.rules}
+        return [
+            {
+                "key": key,
+                "kind": rules[key].kind,
+                "cost": rules[key].cost,
+                "hit_rate": (
+                    round(self.rates[key], 4) if key in self.rates else None
+                ),
+            }
+            for key in self.order
+        ]
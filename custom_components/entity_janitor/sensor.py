@@ -1,10 +1,11 @@
 """Sensor platform for Entity Janitor."""
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
@@ -33,6 +34,8 @@ async def async_setup_entry(
         EntityJanitorSensor(coordinator, "obsolete_count"),
         EntityJanitorSensor(coordinator, "total_entities"),
         EntityJanitorSensor(coordinator, "last_scan"),
+        EntityJanitorSensor(coordinator, "scan_diagnostics"),
+        EntityJanitorSensor(coordinator, "orphaned_devices"),
     ]
 
     async_add_entities(sensors)
@@ -51,6 +54,12 @@ class EntityJanitorSensor(CoordinatorEntity, SensorEntity):
         self._sensor_type = sensor_type
         self._attr_name = f"Entity Janitor {sensor_type.replace('_', ' ').title()}"
         self._attr_unique_id = f"{DOMAIN}_{sensor_type}"
+        if sensor_type == "scan_diagnostics":
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attributes_key: Optional[Tuple[Any, ...]] = None
+        self._attributes: Dict[str, Any] = {}
+        self._last_state_key: Optional[Tuple[Any, ...]] = None
 
     @property
     def native_value(self) -> Any:
@@ -67,41 +76,110 @@ class EntityJanitorSensor(CoordinatorEntity, SensorEntity):
                     return dt_util.parse_datetime(last_scan)
                 return last_scan
             return None
+        elif self._sensor_type == "scan_diagnostics":
+            # Duration of the last full scan
+            stats = self.coordinator.operation_stats.get("scan")
+            return stats.duration_ms if stats else None
+        elif self._sensor_type == "orphaned_devices":
+            return self.coordinator.data.get("orphaned_devices", 0)
         return None
 
     @property
     def device_class(self) -> Optional[SensorDeviceClass]:
         """Return the device class."""
-        if self._sensor_type in ["obsolete_count", "total_entities"]:
+        if self._sensor_type in [
+            "obsolete_count", "total_entities", "orphaned_devices"
+        ]:
             return None  # No specific device class for counts
         elif self._sensor_type == "last_scan":
             return SensorDeviceClass.TIMESTAMP
+        elif self._sensor_type == "scan_diagnostics":
+            return SensorDeviceClass.DURATION
         return None
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return extra state attributes."""
         if self._sensor_type == "obsolete_count":
-            # Get obsolete entities from coordinator property
-            obsolete_entities = getattr(self.coordinator, 'obsolete_entities', [])
             return {
-                "obsolete_entities": [
-                    entity["entity_id"] for entity in obsolete_entities
-                ][:50],  # Limit to first 50 to avoid state size limits
+                **self._generation_attributes(),
                 "scan_in_progress": self.coordinator.data.get("scan_in_progress", False),
+                "scan_progress": self.coordinator.scan_progress,
             }
         elif self._sensor_type == "total_entities":
-            # Get obsolete entities from coordinator property
-            obsolete_entities = getattr(self.coordinator, 'obsolete_entities', [])
+            return self._generation_attributes()
+        elif self._sensor_type == "scan_diagnostics":
             return {
+                f"last_{operation}": stats.as_dict()
+                for operation, stats in self.coordinator.operation_stats.items()
+            }
+        elif self._sensor_type == "orphaned_devices":
+            last_device_scan = self.coordinator.data.get("last_device_scan")
+            return {
+                # Limit to first 50 to avoid state size limits
+                "orphaned_devices": [
+                    device.device_id
+                    for device in self.coordinator.orphaned_devices[:50]
+                ],
+                "last_device_scan": (
+                    last_device_scan.isoformat() if last_device_scan else None
+                ),
+            }
+        return {}
+
+    def _generation_attributes(self) -> Dict[str, Any]:
+        """Return attributes derived from scan results, cached per generation."""
+        data = self.coordinator.data
+        cache_key = (data.get("generation"), data.get("total_entities"))
+        if cache_key == self._attributes_key:
+            return self._attributes
+
+        if self._sensor_type == "obsolete_count":
+            attributes = {
+                # Limit to first 50 to avoid state size limits
+                "obsolete_entities": self.coordinator.obsolete_entity_ids(50),
+            }
+        else:
+            attributes = {
                 "obsolete_percentage": (
                     round(
-                        (len(obsolete_entities) / 
-                         max(self.coordinator.data.get("total_entities", 1), 1)) * 100, 2
+                        (data.get("obsolete_entities", 0) /
+                         max(data.get("total_entities", 1), 1)) * 100, 2
                     )
                 )
             }
-        return {}
+
+        self._attributes_key = cache_key
+        self._attributes = attributes
+        return attributes
+
+    def _state_key(self) -> Tuple[Any, ...]:
+        """Return everything the written state depends on."""
+        data = self.coordinator.data
+        key: Tuple[Any, ...] = (
+            self.available,
+            data.get("generation"),
+            self.native_value,
+        )
+        if self._sensor_type == "obsolete_count":
+            key += (data.get("scan_in_progress"), self.coordinator.scan_progress)
+        elif self._sensor_type == "total_entities":
+            key += (data.get("total_entities"),)
+        elif self._sensor_type == "scan_diagnostics":
+            # Each run records a new stats object
+            key += tuple(self.coordinator.operation_stats.values())
+        elif self._sensor_type == "orphaned_devices":
+            key += (data.get("last_device_scan"),)
+        return key
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when something the sensor shows has changed."""
+        state_key = self._state_key()
+        if state_key == self._last_state_key:
+            return
+        self._last_state_key = state_key
+        self.async_write_ha_state()
 
     @property
     def icon(self) -> str:
@@ -112,6 +190,10 @@ class EntityJanitorSensor(CoordinatorEntity, SensorEntity):
             return "mdi:counter"
         elif self._sensor_type == "last_scan":
             return "mdi:clock-outline"
+        elif self._sensor_type == "scan_diagnostics":
+            return "mdi:timer-cog-outline"
+        elif self._sensor_type == "orphaned_devices":
+            return "mdi:devices"
         return "mdi:information"
 
     @property
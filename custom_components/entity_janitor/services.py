@@ -1,20 +1,35 @@
 """Services for Entity Janitor integration."""
 import logging
-from typing import Any, Dict, List
 
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.helpers import config_validation as cv
 
 from .const import (
     DOMAIN,
+    BACKUP_FORMAT_EXTENSIONS,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    PAGE_SORT_KEYS,
     SERVICE_SCAN_FOR_OBSOLETE,
     SERVICE_CLEAN_OBSOLETE,
     SERVICE_BACKUP_ENTITIES,
     SERVICE_RESTORE_ENTITIES,
+    SERVICE_QUERY_OBSOLETE,
+    SERVICE_LIST_OBSOLETE,
+    SERVICE_SCAN_ORPHANED_DEVICES,
+    SERVICE_CLEAN_ORPHANED_DEVICES,
+    SERVICE_CANCEL_SCAN,
+    SERVICE_GET_SCAN_DELTAS,
 )
-from .coordinator import EntityJanitorCoordinator
+from .coordinator import EntityJanitorCoordinator, ScanCancelledError
+from .models import ObsoleteIndex
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,12 +43,47 @@ SERVICE_CLEAN_OBSOLETE_SCHEMA = vol.Schema({
 
 SERVICE_BACKUP_ENTITIES_SCHEMA = vol.Schema({
     vol.Optional("entity_ids", default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("backup_format"): vol.In(list(BACKUP_FORMAT_EXTENSIONS)),
 })
 
 SERVICE_RESTORE_ENTITIES_SCHEMA = vol.Schema({
     vol.Required("backup_file"): cv.string,
 })
 
+SERVICE_QUERY_OBSOLETE_SCHEMA = vol.Schema({
+    vol.Optional("entity_ids"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("domain"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("platform"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("reason"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("config_entry_id"): vol.All(cv.ensure_list, [cv.string]),
+})
+
+SERVICE_LIST_OBSOLETE_SCHEMA = vol.Schema({
+    vol.Optional("page_size", default=DEFAULT_PAGE_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+    ),
+    vol.Optional("sort", default="entity_id"): vol.In(PAGE_SORT_KEYS),
+    vol.Optional("order", default="asc"): vol.In(["asc", "desc"]),
+    vol.Optional("cursor"): cv.string,
+})
+
+SERVICE_CANCEL_SCAN_SCHEMA = vol.Schema({})
+
+SERVICE_GET_SCAN_DELTAS_SCHEMA = vol.Schema({
+    vol.Optional("since_generation", default=0): vol.All(
+        vol.Coerce(int), vol.Range(min=0)
+    ),
+})
+
+SERVICE_SCAN_ORPHANED_DEVICES_SCHEMA = vol.Schema({})
+
+SERVICE_CLEAN_ORPHANED_DEVICES_SCHEMA = vol.Schema({
+    vol.Optional("device_ids", default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("dry_run", default=True): bool,
+    vol.Optional("backup_before_clean", default=True): bool,
+})
+
 
 async def async_setup_services(hass: HomeAssistant, coordinator: EntityJanitorCoordinator) -> None:
     """Set up services for Entity Janitor."""
@@ -43,6 +93,9 @@ async def async_setup_services(hass: HomeAssistant, coordinator: EntityJanitorCo
         try:
             obsolete_entities = await coordinator.async_scan_for_obsolete()
             _LOGGER.info(f"Scan service completed. Found {len(obsolete_entities)} obsolete entities")
+        except ScanCancelledError:
+            _LOGGER.info("Scan service cancelled")
+            raise
         except Exception as ex:
             _LOGGER.error(f"Error in scan service: {ex}")
             raise
@@ -67,20 +120,20 @@ async def async_setup_services(hass: HomeAssistant, coordinator: EntityJanitorCo
     async def handle_backup_entities(call: ServiceCall) -> None:
         """Handle backup entities service call."""
         entity_ids = call.data.get("entity_ids", [])
+        backup_format = call.data.get("backup_format")
         
         try:
             if entity_ids:
                 # Backup specific entities
-                entities_to_backup = [
-                    entity for entity in coordinator.obsolete_entities
-                    if entity["entity_id"] in entity_ids
-                ]
+                entities_to_backup = coordinator.query_obsolete(entity_ids)
             else:
                 # Backup all obsolete entities
                 entities_to_backup = coordinator.obsolete_entities
             
             if entities_to_backup:
-                backup_file = await coordinator.async_backup_entities(entities_to_backup)
+                backup_file = await coordinator.async_backup_entities(
+                    entities_to_backup, backup_format
+                )
                 _LOGGER.info(f"Backup service completed: {backup_file}")
             else:
                 _LOGGER.warning("No entities to backup")
@@ -88,17 +141,78 @@ async def async_setup_services(hass: HomeAssistant, coordinator: EntityJanitorCo
             _LOGGER.error(f"Error in backup service: {ex}")
             raise
 
-    async def handle_restore_entities(call: ServiceCall) -> None:
+    async def handle_restore_entities(call: ServiceCall) -> ServiceResponse:
         """Handle restore entities service call."""
         backup_file = call.data.get("backup_file")
         
         try:
-            # TODO: Implement restore functionality
-            _LOGGER.warning("Restore functionality not yet implemented")
+            return await coordinator.async_restore_entities(backup_file)
         except Exception as ex:
             _LOGGER.error(f"Error in restore service: {ex}")
             raise
 
+    async def handle_query_obsolete(call: ServiceCall) -> ServiceResponse:
+        """Handle query obsolete service call."""
+        entities = coordinator.query_obsolete(
+            call.data.get("entity_ids"),
+            **{
+                field: call.data.get(field)
+                for field in ObsoleteIndex.INDEXED_FIELDS
+            },
+        )
+        return {
+            "count": len(entities),
+            "entities": [entity.as_dict() for entity in entities],
+        }
+
+    async def handle_list_obsolete(call: ServiceCall) -> ServiceResponse:
+        """Handle list obsolete service call."""
+        return coordinator.get_obsolete_page(
+            call.data["page_size"],
+            call.data["sort"],
+            call.data["order"] == "desc",
+            call.data.get("cursor"),
+        )
+
+    async def handle_cancel_scan(call: ServiceCall) -> ServiceResponse:
+        """Handle cancel scan service call."""
+        return {"cancelled": coordinator.async_cancel_scan()}
+
+    async def handle_get_scan_deltas(call: ServiceCall) -> ServiceResponse:
+        """Handle get scan deltas service call."""
+        return {
+            "generation": coordinator.data.get("generation"),
+            "deltas": [
+                delta.as_dict()
+                for delta in coordinator.get_scan_deltas(
+                    call.data["since_generation"]
+                )
+            ],
+        }
+
+    async def handle_scan_orphaned_devices(call: ServiceCall) -> ServiceResponse:
+        """Handle scan orphaned devices service call."""
+        devices = await coordinator.async_scan_devices()
+        return {
+            "count": len(devices),
+            "devices": [device.as_dict() for device in devices],
+        }
+
+    async def handle_clean_orphaned_devices(call: ServiceCall) -> ServiceResponse:
+        """Handle clean orphaned devices service call."""
+        device_ids = call.data.get("device_ids", [])
+
+        try:
+            result = await coordinator.async_clean_devices(
+                device_ids=device_ids if device_ids else None,
+                dry_run=call.data.get("dry_run", True),
+                backup_before_clean=call.data.get("backup_before_clean", True),
+            )
+        except Exception as ex:
+            _LOGGER.error(f"Error in device clean service: {ex}")
+            raise
+        return result
+
     # Register services
     hass.services.async_register(
         DOMAIN,
@@ -126,4 +240,53 @@ async def async_setup_services(hass: HomeAssistant, coordinator: EntityJanitorCo
         SERVICE_RESTORE_ENTITIES,
         handle_restore_entities,
         schema=SERVICE_RESTORE_ENTITIES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_OBSOLETE,
+        handle_query_obsolete,
+        schema=SERVICE_QUERY_OBSOLETE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_OBSOLETE,
+        handle_list_obsolete,
+        schema=SERVICE_LIST_OBSOLETE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_SCAN,
+        handle_cancel_scan,
+        schema=SERVICE_CANCEL_SCAN_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SCAN_DELTAS,
+        handle_get_scan_deltas,
+        schema=SERVICE_GET_SCAN_DELTAS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCAN_ORPHANED_DEVICES,
+        handle_scan_orphaned_devices,
+        schema=SERVICE_SCAN_ORPHANED_DEVICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAN_ORPHANED_DEVICES,
+        handle_clean_orphaned_devices,
+        schema=SERVICE_CLEAN_ORPHANED_DEVICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
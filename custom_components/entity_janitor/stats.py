@@ -0,0 +1,72 @@
+"""Timing and counters for Entity Janitor scans and cleanups."""
+import time
+from typing import Any, Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+
+class OperationStats:
+    """Per-phase timings and counters of one scan or cleanup run.
+
+    Coarse phases that run once per operation are always timed. Phases
+    that run once per entity are only timed when detailed is set, so a
+    scan with detailed logging off pays for a handful of clock reads.
+    """
+
+    __slots__ = (
+        "operation",
+        "detailed",
+        "started_at",
+        "_started",
+        "duration",
+        "phases",
+        "counters",
+        "reasons",
+    )
+
+    def __init__(self, operation: str, detailed: bool = False) -> None:
+        """Start recording an operation."""
+        self.operation = operation
+        self.detailed = detailed
+        self.started_at = dt_util.utcnow()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.reasons: Dict[str, int] = {}
+
+    def add_time_since(self, phase: str, started: float) -> float:
+        """Add the time since a perf_counter reading and return the new reading."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - started
+        return now
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def finish(self) -> None:
+        """Record the total duration."""
+        self.duration = time.perf_counter() - self._started
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Return the total duration in milliseconds."""
+        if self.duration is None:
+            return None
+        return round(self.duration * 1000, 2)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats as a JSON-serializable dict."""
+        return {
+            "operation": self.operation,
+            "detailed": self.detailed,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "phases_ms": {
+                phase: round(seconds * 1000, 2)
+                for phase, seconds in self.phases.items()
+            },
+            "counters": dict(self.counters),
+            "reasons": dict(self.reasons),
+        }